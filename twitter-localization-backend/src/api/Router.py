@@ -5,7 +5,10 @@ from flask import request, Response
 from flask import jsonify
 
 from src.api.ApiContext import ApiContext
+from src.localization import LanguageModels
+from src.localization import MetamodelArtifacts
 from src.localization.Database import Database
+from src.localization.FeatureValueCache import FeatureValueCache
 from src.localization.metamodels.FeatureCombination1 import FeatureCombination1
 from src.localization.metamodels.FeatureCombination2 import FeatureCombination2
 from src.localization.metamodels.FeatureCombination3 import FeatureCombination3
@@ -59,7 +62,7 @@ def route(app):
         lock_acquired = api_context.metamodel_locks[metamodel_name].acquire(blocking=True, timeout=2)
         if not lock_acquired:
             return Response("Metamodel '" + metamodel_name + "' is already being built", status=423)
-        ModelBuilder(metamodel_name).start()
+        ModelBuilder(metamodel_name, rebuild=request_body.get("rebuild", False)).start()
         return Response(status=204)
 
     @app.route("/localize", methods=["POST"])
@@ -80,6 +83,22 @@ def route(app):
         LocalizationWorker(screen_name, metamodel_name).start()
         return jsonify(api_context.localizations_update())
 
+    @app.route("/localizemany", methods=["POST"])
+    def localizemany():
+        request_body = request.get_json()
+        if "screenNames" not in request_body:
+            return Response("No 'screenNames' specified", status=400)
+        if "metamodel" not in request_body:
+            return Response("No 'metamodel' specified", status=400)
+        screen_names = request_body["screenNames"]
+        metamodel_name = request_body["metamodel"]
+        if metamodel_name not in api_context.metamodel_status():
+            return Response("No metamodel '" + metamodel_name + "'", status=404)
+        if api_context.metamodel_status()[metamodel_name]["status"] != "online":
+            return Response("Metamodel '" + metamodel_name + "' is offline", status=404)
+        BatchLocalizationWorker(screen_names, metamodel_name).start()
+        return jsonify(api_context.localizations_update())
+
     @app.route("/localizations")
     def localizations():
         return jsonify(api_context.localizations_update())
@@ -110,43 +129,65 @@ def route(app):
             "sportsInfluencersCount": sports_count,
             "politicsInfluencersCount": politics_count,
             "otherInfluencersCount": other_count,
+            "featureValueCache": FeatureValueCache.instance().get_stats(),
+            "residentLanguageModels": LanguageModels.get_resident_languages(),
         }
         return jsonify(stats)
     # =================== End Routes ===================== #
 
     class ModelBuilder(Thread):
 
-        def __init__(self, metamodel_name):
+        def __init__(self, metamodel_name, rebuild=False):
+            """
+            :param rebuild: if True, the metamodel is built even if a matching artifact exists (see MetamodelArtifacts)
+            """
             super().__init__()
             self._metamodel_name = metamodel_name
+            self._rebuild = rebuild
             self._metamodel = None
 
-        def _instantiate_metamodel(self):
-            metamodel = None
+        def _get_metamodel_class(self):
+            metamodel_class = None
             if self._metamodel_name == "SimpleHashtagSimilarity":
-                metamodel = SimpleHashtagSimilarity()
+                metamodel_class = SimpleHashtagSimilarity
             elif self._metamodel_name == "SimpleInfluencerFollowedRatio":
-                metamodel = SimpleInfluencerFollowedRatio()
+                metamodel_class = SimpleInfluencerFollowedRatio
             elif self._metamodel_name == "SimpleSwissNamedPlaces":
-                metamodel = SimpleSwissNamedPlacesCount()
+                metamodel_class = SimpleSwissNamedPlacesCount
             elif self._metamodel_name == "SimpleSwissTweetInteraction":
-                metamodel = SimpleSwissTweetInteraction()
+                metamodel_class = SimpleSwissTweetInteraction
             elif self._metamodel_name == "SimpleTweetInteractionBehavior":
-                metamodel = SimpleTweetInteractionBehavior()
+                metamodel_class = SimpleTweetInteractionBehavior
             elif self._metamodel_name == "FeatureCombination1":
-                metamodel = FeatureCombination1()
+                metamodel_class = FeatureCombination1
             elif self._metamodel_name == "FeatureCombination2":
-                metamodel = FeatureCombination2()
+                metamodel_class = FeatureCombination2
             elif self._metamodel_name == "FeatureCombination3":
-                metamodel = FeatureCombination3()
+                metamodel_class = FeatureCombination3
             elif self._metamodel_name == "FeatureCombination4":
-                metamodel = FeatureCombination4()
+                metamodel_class = FeatureCombination4
             elif self._metamodel_name == "FeatureCombination5":
-                metamodel = FeatureCombination5()
-            return metamodel
+                metamodel_class = FeatureCombination5
+            return metamodel_class
+
+        def _instantiate_metamodel(self):
+            metamodel_class = self._get_metamodel_class()
+            if metamodel_class is None:
+                return None
+            return metamodel_class()
 
         def run(self):
             api_context.set_metamodel_status(self._metamodel_name, "building")
+            if (not self._rebuild) and (self._get_metamodel_class() is not None):
+                try:
+                    self._metamodel = MetamodelArtifacts.load(self._metamodel_name, self._get_metamodel_class())
+                except Exception:
+                    print(traceback.format_exc())  # unreadable artifact, build the metamodel instead
+                if self._metamodel is not None:
+                    api_context.set_metamodel(self._metamodel_name, self._metamodel)
+                    api_context.set_metamodel_status(self._metamodel_name, "online")
+                    api_context.metamodel_locks[self._metamodel_name].release()
+                    return
             self._metamodel = self._instantiate_metamodel()
 
             if self._metamodel is None:
@@ -164,6 +205,10 @@ def route(app):
                 api_context.metamodel_locks[self._metamodel_name].release()
                 print(traceback.format_exc())
                 return
+            try:
+                MetamodelArtifacts.save(self._metamodel_name, self._metamodel)
+            except Exception:
+                print(traceback.format_exc())  # the built metamodel is served anyway, it is rebuilt on the next start
             api_context.set_metamodel_status(self._metamodel_name, "online")
             api_context.metamodel_locks[self._metamodel_name].release()
 
@@ -184,3 +229,31 @@ class LocalizationWorker(Thread):
         finally:
             api_context.localization_worker_lock.release()
 
+
+class BatchLocalizationWorker(Thread):
+    """
+    Localizes many users with Metamodel#classify_many, each localization is completed as soon as its batch is done
+    """
+
+    def __init__(self, screen_names, metamodel_name):
+        super().__init__()
+        self._screen_names = list(dict.fromkeys(screen_names))  # without duplicates, in the requested order
+        self._metamodel_name = metamodel_name
+        self._pending_localizations = dict([(screen_name, api_context.add_pending_localization(screen_name,
+                                                                                               metamodel_name))
+                                            for screen_name in self._screen_names])
+
+    def run(self):
+        api_context.localization_worker_lock.acquire(blocking=True)
+        try:
+            results = api_context.metamodel(self._metamodel_name).classify_many(self._screen_names)
+            for screen_name, predicted_class, confidence in results:
+                pending_localization = self._pending_localizations.pop(screen_name, None)
+                if pending_localization is not None:
+                    api_context.add_complete_localization(pending_localization, (predicted_class, confidence))
+        finally:
+            # users without a result, e.g. after classify_many raised, are reported as failed instead of staying pending
+            for pending_localization in self._pending_localizations.values():
+                api_context.add_complete_localization(pending_localization, (None, None))
+            self._pending_localizations.clear()
+            api_context.localization_worker_lock.release()
@@ -10,6 +10,11 @@ from src.geonames.GeonamesApi import GeonamesApi
 from src.geonames.GeonamesException import GeonamesException
 from src.geonames.GeonamesLocalDatabase import GeonamesLocalDatabase
 from src.geonames.GeonamesRateLimitException import GeonamesRateLimitException
+from src.localization.FollowerSetStore import FollowerSetStore
+from src.localization.HashtagHistogramStore import HashtagHistogramStore
+from src.localization.InfluencerFollowerIndex import InfluencerFollowerIndex
+from src.localization.SortedIdSet import SortedIdSet
+from src.localization.SwissUserIndex import SwissUserIndex
 from src.model import constants
 from src.util import collections
 from src.util import context, timing, paths
@@ -68,7 +73,8 @@ class UserManager:
         """
         Fetches follower IDs from Twitter API for each follower in the DB, adds them as ab array in the respective
         user document in the DB, as field `follower_ids`. If not `perform_update`, skips users where this field
-        already exists. Else, overwrites this field.
+        already exists. Else, overwrites this field. Updates the influencer's follower set in the FollowerSetStore, and
+        rebuilds the InfluencerFollowerIndex afterwards.
 
         :param perform_update: if False, skips users where the `followerIds` field already exists. If True, includes
                                these users as well, and replaces the field with the latest data
@@ -87,6 +93,8 @@ class UserManager:
             self._set_crawl_status(self._influencers_mongodb.find_one({"id": influencer_user["id"]}),
                                    constants.CrawlStatus.FOLLOWER_IDS_COLLECTED.value)
             self._users_mongodb.save(influencer_user)
+            FollowerSetStore.instance().update(influencer_user["id"], follower_ids)
+        InfluencerFollowerIndex.instance().rebuild()
 
     def fetch_influencer_followers_to_db(self, handle_no_users_found=False):
         """
@@ -101,10 +109,12 @@ class UserManager:
         """
         print(timing.get_timestamp() + ":", "started fetching influencer followers to DB, getting current IDs")
         influencers_cursor = self._users_mongodb.find({"type": constants.UserType.INFLUENCER.value},
-                                                      no_cursor_timeout=True)
+                                                      {"followerIds": 0}, no_cursor_timeout=True)
+        existing_ids = self._get_existing_user_ids()
 
         for influencer_user in influencers_cursor:
-            new_ids = self._fetch_uncrawled_follower_ids_for_influencer(influencer_user)
+            new_ids = self._fetch_uncrawled_follower_ids_for_influencer(influencer_user, existing_ids)
+            inserted_ids = []
             chunks = collections.split_list_into_chunks(new_ids, chunk_size=100)
             num_chunks = len(chunks)
             print("{}: created {} chunks".format(timing.get_timestamp(), num_chunks))
@@ -118,23 +128,26 @@ class UserManager:
                 for user in bulk:
                     n_user = self._normalize_user_for_mongo(user)
                     self._users_mongodb.save(n_user)
+                    inserted_ids.append(n_user["id"])
+            existing_ids = existing_ids.union(SortedIdSet(inserted_ids))
             time.sleep(UserManager._CRAWL_DELAY_SECONDS)
         influencers_cursor.close()
 
-    def _fetch_uncrawled_follower_ids_for_influencer(self, influencer_user):
+    def _fetch_uncrawled_follower_ids_for_influencer(self, influencer_user, existing_ids):
+        """
+        :param influencer_user: influencer user document
+        :param existing_ids:    SortedIdSet with the IDs of all users in the users collection
+        :return:                list of the influencer's follower IDs which are not in the users collection yet
+        """
         print("{}: fetching uncrawled follower IDs for influencer {} ({})".format(timing.get_timestamp(),
                                                                                   influencer_user["screen_name"],
                                                                                   influencer_user["id"]))
-        follower_ids_list = influencer_user["followerIds"]
-        existing_users_cursor = self._users_mongodb.find({"id": {"$in": follower_ids_list}}, {"_id": 1, "id": 1})
-
-        existing_users_list = []
-        for user in existing_users_cursor:
-            existing_users_list.append(user["id"])
-        existing_ids_set = set(existing_users_list)
+        follower_ids = FollowerSetStore.instance().get(influencer_user)
+        return follower_ids.difference(existing_ids).to_list()
 
-        follower_ids_set = set(follower_ids_list)
-        return list(follower_ids_set.difference(existing_ids_set))
+    def _get_existing_user_ids(self):
+        print("{}: loading IDs of existing users".format(timing.get_timestamp()))
+        return SortedIdSet(user["id"] for user in self._users_mongodb.find({}, {"_id": 0, "id": 1}))
 
     def add_local_swiss_geonames_info(self):
         """
@@ -222,6 +235,7 @@ class UserManager:
         users_test_set_cursor = self._users_test_set_mongodb.find({"user_place.geonames_id": {"$exists": True},
                                                                    "is_swiss": {"$exists": False}})
         self._set_is_swiss_for_cursor(users_test_set_cursor, self._users_test_set_mongodb)
+        SwissUserIndex.instance().invalidate()
 
     # TODO: move this to a new module
     def collect_tweets_for_influencers(self):
@@ -277,6 +291,47 @@ class UserManager:
         self._collect_tweets_for_users(user_cursor, self._users_mongodb, skip_if_tweets_found=True)
         return new_user
 
+    def find_local_twitter_users(self, screen_names):
+        """
+        Finds many users in the users and users_test_set collections, with a single query per collection
+        :param screen_names:    list of screen names
+        :return:                dictionary {screen name: user} of the users found; like ensure_fetch_twitter_user,
+                                users in the users collection take precedence
+        """
+        found_users = {}
+        for collection in [self._users_mongodb, self._users_test_set_mongodb]:
+            remaining = [screen_name for screen_name in set(screen_names) if screen_name not in found_users]
+            if len(remaining) == 0:
+                break
+            for user in collection.find({"screen_name": {"$in": remaining}}):
+                found_users.setdefault(user["screen_name"], user)
+        return found_users
+
+    def fetch_new_twitter_users(self, screen_names):
+        """
+        Fetches users that are not in the database from the Twitter API, 100 users per lookup, and stores them in the
+        users collection along with their friend IDs and tweets (see ensure_fetch_twitter_user)
+        :param screen_names:    list of screen names of users that are not in the database
+        :return:                dictionary {screen name: user} of the users found on Twitter
+        """
+        new_users = {}
+        requested = dict([(screen_name.lower(), screen_name) for screen_name in screen_names])
+        for chunk in collections.split_list_into_chunks(list(requested.values()), chunk_size=100):
+            print("{}: looking up {} users on Twitter".format(timing.get_timestamp(), len(chunk)))
+            bulk = self._twitter.find_multiple_users(screen_names=chunk)
+            if bulk is None:
+                continue
+            for user in bulk:
+                n_user = self._normalize_user_for_mongo(user)
+                n_user["friend_ids"] = self._twitter.get_friend_ids(n_user["id"])
+                self._users_mongodb.save(n_user)
+                # Twitter screen names are case-insensitive, return the users under the requested spelling
+                new_users[requested.get(n_user["screen_name"].lower(), n_user["screen_name"])] = n_user
+        if len(new_users) > 0:
+            user_cursor = self._users_mongodb.find({"id": {"$in": [user["id"] for user in new_users.values()]}})
+            self._collect_tweets_for_users(user_cursor, self._users_mongodb, skip_if_tweets_found=True)
+        return new_users
+
     def fetch_friend_ids_for_tvt_set(self, fname):
         with open(paths.convert_project_relative_path(os.path.join("configs", str(fname) + ".json")), "r") as infile:
             data = json.load(infile)
@@ -311,6 +366,7 @@ class UserManager:
                 n_tweets.append(self._normalize_tweet_for_db(tweet))
             if len(n_tweets) > 0:
                 self._tweets_mongodb.insert_many(n_tweets)
+            HashtagHistogramStore.instance().add_tweets(user["id"], n_tweets)
             user["tweets_fetched"] = True
             user_collection.save(user)
 
@@ -1,3 +1,5 @@
+import numpy as np
+
 from src.localization.UntrainedClassifierError import UntrainedClassifierError
 
 
@@ -23,6 +25,22 @@ class Classifier:
         self._is_trained = True
         return score
 
+    def update(self, new_samples, training_set, validation_set):
+        """
+        Updates the trained classifier with newly labeled training samples.
+        :param new_samples:     2-dimensional numpy-array with the new samples as row vectors, true class in the last
+                                column
+        :param training_set:    the whole training set the classifier was trained on, new samples appended
+        :param validation_set:  2-dimensional numpy-array with samples as row vectors, true class in the last column
+        :return:                validation performance score, see train()
+        :raises UntrainedClassifierError: if this function is called before the classifier has been trained
+        """
+        if not self._is_trained:
+            raise UntrainedClassifierError(self._classifier_name)
+        score = self._update(new_samples, training_set, validation_set)
+        assert isinstance(score, int) or isinstance(score, float)
+        return score
+
     def classify(self, sample):
         """
         Classifies a given sample into 1 (positive) and 0 (negative)
@@ -35,11 +53,38 @@ class Classifier:
         predicted_class, confidence = self._classify(sample)
         return predicted_class, confidence
 
+    def classify_batch(self, samples):
+        """
+        Classifies many samples at once into 1 (positive) and 0 (negative)
+        :param samples: 2-dimensional numpy array with samples as row vectors
+        :return:        numpy array of classes (1 (positive) or 0 (negative)), numpy array of confidences ([0.5, 1]),
+                        both in the same order as the samples
+        :raises UntrainedClassifierError: if this function is called before the classifier has been trained
+        """
+        if not self._is_trained:
+            raise UntrainedClassifierError(self._classifier_name)
+        return self._classify_batch(samples)
+
     def get_name(self):
         return self._classifier_name
 
     def _classify(self, sample):
         raise NotImplementedError("function _classify() is abstract in Classifier")
 
+    def _classify_batch(self, samples):
+        """
+        Classifies many samples, override this function for classifiers that can classify several samples more
+        efficiently than one by one
+        """
+        results = [self._classify(sample) for sample in samples]
+        return np.array([r[0] for r in results], dtype=int), np.array([r[1] for r in results], dtype=float)
+
     def _train(self, training_set, validation_set):
         raise NotImplementedError("function _train() is abstract in Classifier")
+
+    def _update(self, new_samples, training_set, validation_set):
+        """
+        Retrains the classifier on the whole training set, override this function for classifiers that can learn from
+        the new samples alone
+        """
+        return self._train(training_set, validation_set)
@@ -16,6 +16,11 @@ class Database:
         self.geonames_places_mongodb = self._database_connection[context.get_config("geonames_places_collection")]
         self.tweets_mongodb = self._database_connection[context.get_config("tweets_collection")]
         self.feature_cache = self._database_connection[context.get_config("feature_cache_collection")]
+        self.ner_cache = self._database_connection[context.get_config("ner_cache_collection")]
+        self.influencer_follower_index = self._database_connection[
+            context.get_config("influencer_follower_index_collection")]
+        self.hashtag_vocabulary = self._database_connection[context.get_config("hashtag_vocabulary_collection")]
+        self.hashtag_histograms = self._database_connection[context.get_config("hashtag_histograms_collection")]
 
     @staticmethod
     def instance():
@@ -0,0 +1,94 @@
+import inspect
+
+from sklearn.neighbors import KNeighborsClassifier
+
+from src.localization import TrainValidateTestProvider
+from src.localization.Classifier import Classifier
+from src.localization.FeatureExtractorRegistry import FeatureExtractorRegistry
+from src.localization.Metamodel import Metamodel
+from src.localization.classifiers.SKLearn import SKLearn
+from src.util import context, timing
+
+
+class DeclarativeMetamodel(Metamodel):
+    """
+    Metamodel defined by a list of feature extractor specs and a classifier spec, set as class attributes by
+    subclasses. Specs are (class, dictionary of keyword arguments) tuples:
+    - FEATURE_EXTRACTOR_SPECS: FeatureExtractor subclasses. The extractors are taken from the process-wide
+      FeatureExtractorRegistry when the metamodel is built, so metamodels with identical extractor specs share one
+      instance. The argument values TRAIN_SET and USE_CACHE are replaced with the TVT train set and the metamodel's
+      use_cache setting; allow_cache_updates defaults to the metamodel's setting.
+    - CLASSIFIER_SPEC: a Classifier subclass, or an SKLearn classifier class, which is wrapped in SKLearn. Each
+      metamodel gets its own classifier.
+    """
+
+    TRAIN_SET = "$train_set"
+    USE_CACHE = "$use_cache"
+
+    FEATURE_EXTRACTOR_SPECS = []
+    CLASSIFIER_SPEC = None
+
+    def __init__(self, model_name, use_cache=True, allow_cache_updates=True):
+        super().__init__(model_name, use_cache, allow_cache_updates)
+        self._feature_extractors = None
+        self._feature_extractor_keys = None
+        self._clf = self._create_classifier()
+
+    @classmethod
+    def get_config(cls):
+        config = super().get_config()
+        config["feature_extractors"] = [FeatureExtractorRegistry.make_key(extractor_class, arguments)
+                                        for extractor_class, arguments in cls.FEATURE_EXTRACTOR_SPECS]
+        classifier_class, arguments = cls.CLASSIFIER_SPEC
+        config["classifier"] = FeatureExtractorRegistry.make_key(classifier_class, arguments)
+        if issubclass(classifier_class, KNeighborsClassifier):
+            config["knn_index"] = context.get_config("knn_index")  # see SKLearn
+        return config
+
+    def on_artifact_loaded(self):
+        if self._feature_extractors is not None:
+            # share the extractors of loaded artifacts with other metamodels, too
+            registry = FeatureExtractorRegistry.instance()
+            self._feature_extractors = [registry.register(key, extractor) for key, extractor
+                                        in zip(self._feature_extractor_keys, self._feature_extractors)]
+
+    def _create_classifier(self):
+        classifier_class, arguments = self.CLASSIFIER_SPEC
+        if issubclass(classifier_class, Classifier):
+            return classifier_class(**arguments)
+        return SKLearn(classifier_class(**arguments))
+
+    def _resolve_arguments(self, extractor_class, arguments, train_set):
+        resolved_arguments = {}
+        for name, value in arguments.items():
+            if isinstance(value, str) and (value == DeclarativeMetamodel.TRAIN_SET):
+                value = train_set
+            elif isinstance(value, str) and (value == DeclarativeMetamodel.USE_CACHE):
+                value = self._use_cache
+            resolved_arguments[name] = value
+        if ("allow_cache_updates" in inspect.signature(extractor_class.__init__).parameters) and \
+                ("allow_cache_updates" not in resolved_arguments):
+            resolved_arguments["allow_cache_updates"] = self._allow_cache_updates
+        return resolved_arguments
+
+    def _build(self):
+        model_class_name = type(self).__name__
+        train, validate, test = TrainValidateTestProvider.get_data()
+        registry = FeatureExtractorRegistry.instance()
+        feature_extractors = []
+        feature_extractor_keys = []
+        for extractor_class, arguments in self.FEATURE_EXTRACTOR_SPECS:
+            resolved_arguments = self._resolve_arguments(extractor_class, arguments, train)
+            feature_extractors.append(registry.get(extractor_class, resolved_arguments))
+            feature_extractor_keys.append(FeatureExtractorRegistry.make_key(extractor_class, resolved_arguments))
+        self._feature_extractors = feature_extractors
+        self._feature_extractor_keys = feature_extractor_keys
+        print(timing.get_timestamp() + ": {}: building feature matrix for train set".format(model_class_name))
+        train_matrix = self._extract_feature_matrix(train)
+        print(timing.get_timestamp() + ": {}: building feature matrix for validation set".format(model_class_name))
+        validate_matrix = self._extract_feature_matrix(validate)
+        print(timing.get_timestamp() + ": {}: training classifier".format(model_class_name))
+        self._train_classifier(train, train_matrix, validate_matrix)
+
+    def _get_feature_extractors(self):
+        return self._feature_extractors
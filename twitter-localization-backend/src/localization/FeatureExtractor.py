@@ -1,6 +1,13 @@
+import hashlib
+import json
+
 import pymongo
+from pymongo import UpdateOne
+from tqdm import tqdm
 
 from src.localization.Database import Database
+from src.localization.FeatureValueCache import FeatureValueCache
+from src.localization.UserContext import UserContext
 
 
 class FeatureExtractor:
@@ -8,10 +15,38 @@ class FeatureExtractor:
     add doc
     """
 
+    # bump this version whenever an extractor's feature semantics change, to stop reusing previously cached values
+    _CACHE_VERSION = 1
+
+    # tweet fields read by _extract_for(), None if entire tweet documents are needed
+    _REQUIRED_TWEET_FIELDS = []
+
+    # whether extracting features for many users shows a progress bar, disabled in worker processes
+    _show_progress = True
+
     def __init__(self, name, allow_cache_updates=False):
         self._db = Database.instance()
+        self._memory_cache = FeatureValueCache.instance()
         self._name = name
         self._allow_cache_updates = allow_cache_updates
+        self._cache_key = None
+
+    def __getstate__(self):
+        # database connections can't be pickled (e.g. to send feature extractors to worker processes)
+        state = self.__dict__.copy()
+        del state["_db"]
+        del state["_memory_cache"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache_key = None  # derived again, in case the cache version has changed since pickling
+        self._db = Database.instance()
+        self._memory_cache = FeatureValueCache.instance()
+
+    @staticmethod
+    def set_progress_reporting(enabled):
+        FeatureExtractor._show_progress = enabled
 
     def extract_for(self, twitter_user, use_cache=False):
         """
@@ -28,20 +63,152 @@ class FeatureExtractor:
                 self._update_cache(twitter_user, value)
         return value
 
+    def extract_for_many(self, twitter_users, use_cache=False):
+        """
+        Extracts and returns this feature extractor's feature for a list of Twitter users. Cached values are fetched
+        with a single query, only the cache misses are extracted, and the newly extracted values are written back to
+        the cache in a single bulk write (if cache updates are enabled).
+        :param twitter_users:   list of Twitter user objects, as accepted by extract_for()
+        :param use_cache:       whether cached feature values should be used
+        :return:                list of extracted features, in the same order as twitter_users
+        """
+        values = self._fetch_cached_feature_values(twitter_users, use_cache)
+        missing_users = [user for user, value in zip(twitter_users, values) if value is None]
+        if len(missing_users) == 0:
+            return values
+        extracted_values = self._extract_for_many(missing_users)
+        extracted_by_id = {user["id"]: value for user, value in zip(missing_users, extracted_values)}
+        if self._allow_cache_updates:
+            self._update_cache_for_many(missing_users, extracted_values)
+        return [extracted_by_id[user["id"]] if value is None else value for user, value in zip(twitter_users, values)]
+
+    def get_cache_key(self):
+        """
+        Returns the key under which this feature extractor's values are cached. The key is derived from the extractor's
+        name, its cache version and its parameters (see _get_cache_parameters()), so that extractors with different
+        parameters never share cached values, e.g. `top_hashtags_v1_3f2a9c0e1b7d`.
+        :return: cache key, a valid MongoDB field name
+        """
+        if self._cache_key is None:
+            self._cache_key = "{}_v{}".format(self._name, self._CACHE_VERSION)
+            parameters = self._get_cache_parameters()
+            if len(parameters) > 0:
+                serialized_parameters = json.dumps(parameters, sort_keys=True, default=str).encode("utf-8")
+                self._cache_key += "_" + hashlib.sha1(serialized_parameters).hexdigest()[:12]
+        return self._cache_key
+
+    def list_cache_keys(self):
+        """
+        Lists all keys in the feature cache that belong to this feature extractor, across all versions and parameters.
+        :return: sorted list of cache keys
+        """
+        cursor = self._db.feature_cache.aggregate([
+            {"$match": {"id": {"$exists": True}}},
+            {"$project": {"fields": {"$objectToArray": "$$ROOT"}}},
+            {"$unwind": "$fields"},
+            {"$group": {"_id": "$fields.k"}}
+        ], allowDiskUse=True)
+        return sorted([doc["_id"] for doc in cursor if self._is_own_cache_key(doc["_id"])])
+
+    def purge_stale_cache_entries(self):
+        """
+        Removes all cached values of this feature extractor that were stored under a different cache version, including
+        values stored before cache keys were versioned. Values of the current version with other parameters are kept.
+        :return: list of purged cache keys
+        """
+        current_version_prefix = "{}_v{}".format(self._name, self._CACHE_VERSION)
+        stale_keys = [key for key in self.list_cache_keys()
+                      if not (key == current_version_prefix or key.startswith(current_version_prefix + "_"))]
+        if len(stale_keys) > 0:
+            self._db.feature_cache.update_many({"id": {"$exists": True}},
+                                               {"$unset": {key: "" for key in stale_keys}})
+        return stale_keys
+
+    def _is_own_cache_key(self, key):
+        if key == self._name:
+            return True  # unversioned key
+        if not key.startswith(self._name + "_v"):
+            return False
+        return key[len(self._name) + 2:].split("_")[0].isdigit()
+
+    def get_required_tweet_fields(self):
+        """
+        :return: list of the tweet fields this feature extractor reads, None if it needs entire tweet documents
+        """
+        return self._REQUIRED_TWEET_FIELDS
+
+    def _get_tweets(self, twitter_user):
+        """
+        Returns a user's tweets with (at least) the fields required by this feature extractor. If twitter_user is a
+        UserContext, its shared tweets are used; otherwise, the tweets are loaded from MongoDB.
+        """
+        if isinstance(twitter_user, UserContext):
+            return twitter_user.get_tweets(self.get_required_tweet_fields())
+        return UserContext.load_tweets(twitter_user["id"], self.get_required_tweet_fields())
+
+    def _get_cache_parameters(self):
+        """
+        Returns the parameters that affect this feature extractor's values, override in extractors with parameters.
+        :return: JSON-serializable dictionary
+        """
+        return {}
+
     def _extract_for(self, twitter_user):
         raise NotImplementedError("function _extract_for() is abstract in FeatureExtractor")
 
+    def _extract_for_many(self, twitter_users):
+        """
+        Extracts this feature for every user in a list, without consulting the cache. Override this function for
+        extractors that can process several users more efficiently than one by one.
+        """
+        show_progress = FeatureExtractor._show_progress and len(twitter_users) > 1
+        return [self._extract_for(twitter_user) for twitter_user in tqdm(twitter_users, disable=not show_progress)]
+
     def _fetch_cached_feature_value(self, twitter_user, use_cache):
         if not use_cache:
             return None
+        cache_key = self.get_cache_key()
+        value = self._memory_cache.get(cache_key, twitter_user["id"])
+        if value is not None:
+            return value
         cached_user = self._db.feature_cache.find_one({"id": twitter_user["id"]})
-        if (cached_user is not None) and (self._name in cached_user):
-            return cached_user[self._name]
+        if (cached_user is not None) and (cache_key in cached_user):
+            self._memory_cache.put(cache_key, twitter_user["id"], cached_user[cache_key])
+            return cached_user[cache_key]
         return None
 
+    def _fetch_cached_feature_values(self, twitter_users, use_cache):
+        if not use_cache:
+            return [None for _ in twitter_users]
+        cache_key = self.get_cache_key()
+        user_ids = [user["id"] for user in twitter_users]
+        cached_values = {}
+        for user_id in user_ids:
+            value = self._memory_cache.get(cache_key, user_id)
+            if value is not None:
+                cached_values[user_id] = value
+        uncached_ids = [user_id for user_id in user_ids if user_id not in cached_values]
+        if len(uncached_ids) > 0:
+            cached_users_cursor = self._db.feature_cache.find({"id": {"$in": uncached_ids},
+                                                               cache_key: {"$exists": True}},
+                                                              {"id": 1, cache_key: 1})
+            for cached_user in cached_users_cursor:
+                cached_values[cached_user["id"]] = cached_user[cache_key]
+                self._memory_cache.put(cache_key, cached_user["id"], cached_user[cache_key])
+        return [cached_values.get(user_id, None) for user_id in user_ids]
+
     def _update_cache(self, twitter_user, feature_value):
-        cached_user = self._db.feature_cache.find_one({"id": twitter_user["id"]})
-        if cached_user is None:
-            cached_user = {"id": twitter_user["id"]}
-        cached_user[self._name] = feature_value
-        self._db.feature_cache.save(cached_user)
+        cache_key = self.get_cache_key()
+        self._db.feature_cache.update_one({"id": twitter_user["id"]},
+                                          {"$set": {cache_key: feature_value}},
+                                          upsert=True)
+        self._memory_cache.invalidate(cache_key, twitter_user["id"])
+
+    def _update_cache_for_many(self, twitter_users, feature_values):
+        cache_key = self.get_cache_key()
+        operations = [UpdateOne({"id": user["id"]}, {"$set": {cache_key: value}}, upsert=True)
+                      for user, value in zip(twitter_users, feature_values)]
+        if len(operations) > 0:
+            self._db.feature_cache.bulk_write(operations, ordered=False)
+        for user in twitter_users:
+            self._memory_cache.invalidate(cache_key, user["id"])
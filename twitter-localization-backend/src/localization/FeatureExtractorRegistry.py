@@ -0,0 +1,103 @@
+import hashlib
+import inspect
+from threading import Lock
+
+import numpy as np
+
+from src.util import timing
+
+# guards the creation of the shared registry instance
+_instance_lock = Lock()
+
+
+class FeatureExtractorRegistry:
+    """
+    Process-wide registry of feature extractors, which hands out a single shared instance per extractor class and
+    configuration. Metamodels that use the same extractor with the same arguments (see DeclarativeMetamodel) thereby
+    share its reference data (e.g. the Swiss hashtag vector of HashtagSimilarity), which is only computed once.
+    Configurations are compared after binding the arguments to the extractor's constructor, so omitted default
+    arguments and explicitly passed default values are the same configuration. Lists of Twitter users (e.g. a
+    train set) are compared by their user IDs.
+    """
+
+    _instance = None
+
+    def __init__(self):
+        self._extractors = {}
+        self._key_locks = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def instance():
+        if FeatureExtractorRegistry._instance is None:
+            with _instance_lock:
+                if FeatureExtractorRegistry._instance is None:
+                    FeatureExtractorRegistry._instance = FeatureExtractorRegistry()
+        return FeatureExtractorRegistry._instance
+
+    def get(self, extractor_class, arguments):
+        """
+        :param extractor_class: FeatureExtractor subclass
+        :param arguments:       dictionary of keyword arguments to the extractor's constructor
+        :return:                shared extractor instance, created on first request of this configuration
+        """
+        key = FeatureExtractorRegistry.make_key(extractor_class, arguments)
+        with self._get_key_lock(key):
+            if key not in self._extractors:
+                print(timing.get_timestamp() + ": FeatureExtractorRegistry: creating " + extractor_class.__name__)
+                self._extractors[key] = extractor_class(**arguments)
+            return self._extractors[key]
+
+    def register(self, key, extractor):
+        """
+        Registers an existing extractor instance (e.g. one loaded with a metamodel artifact), unless an instance with
+        the same configuration is registered already
+        :param key:         key returned by make_key()
+        :param extractor:   feature extractor instance
+        :return:            the registered instance with this configuration
+        """
+        with self._get_key_lock(key):
+            return self._extractors.setdefault(key, extractor)
+
+    def clear(self):
+        with self._lock:
+            self._extractors = {}
+            self._key_locks = {}
+
+    def __len__(self):
+        return len(self._extractors)
+
+    def _get_key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, Lock())
+
+    @staticmethod
+    def make_key(extractor_class, arguments):
+        """
+        :return:    hashable key of an extractor configuration
+        :raises TypeError:  if an argument is neither a collection, a Twitter user list nor a primitive value
+        """
+        bound_arguments = inspect.signature(extractor_class.__init__).bind(None, **arguments)
+        bound_arguments.apply_defaults()
+        frozen_arguments = tuple(sorted([(name, FeatureExtractorRegistry._freeze(value))
+                                         for name, value in bound_arguments.arguments.items() if name != "self"]))
+        return extractor_class.__module__ + "." + extractor_class.__name__, frozen_arguments
+
+    @staticmethod
+    def _freeze(value):
+        if isinstance(value, dict):
+            return tuple(sorted([(str(k), FeatureExtractorRegistry._freeze(v)) for k, v in value.items()]))
+        if isinstance(value, (list, tuple)):
+            if (len(value) > 0) and all([isinstance(item, dict) and ("id" in item) for item in value]):
+                # list of Twitter users, identified by their sorted IDs
+                user_ids = sorted([str(item["id"]) for item in value])
+                return "users:" + hashlib.sha1(",".join(user_ids).encode("utf-8")).hexdigest()
+            return tuple([FeatureExtractorRegistry._freeze(item) for item in value])
+        if isinstance(value, (set, frozenset)):
+            return tuple(sorted([FeatureExtractorRegistry._freeze(item) for item in value], key=repr))
+        if (value is None) or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, np.generic):
+            return value.item()
+        # repr() of most other objects includes their memory address, which would never match another configuration
+        raise TypeError("can't make a key of an argument of type " + type(value).__name__)
@@ -0,0 +1,88 @@
+import multiprocessing
+import pickle
+
+import numpy as np
+from tqdm import tqdm
+
+from src.localization.FeatureExtractor import FeatureExtractor
+from src.localization.UserContext import UserContext
+from src.util import context
+
+
+# number of samples whose tweets are held in memory at once by build_feature_matrix()
+_DEFAULT_CHUNK_SIZE = 50
+
+# state of a worker process in build_feature_matrix_parallel(), set up by _init_worker()
+_worker_feature_extractors = None
+_worker_use_cache = False
+
+
+def build_feature_matrix(sample_set, feature_extractors, use_cache, include_labels=True,
+                         chunk_size=_DEFAULT_CHUNK_SIZE):
+    """
+    Extracts the features of the given feature extractors for every sample, and assembles them into a feature
+    matrix. The sample set is processed in chunks: each feature extractor processes a whole chunk at once (see
+    FeatureExtractor#extract_for_many), and each sample's tweets are loaded at most once, shared among all feature
+    extractors (see UserContext). Only the tweets of one chunk are held in memory at a time.
+    :param sample_set:          list of Twitter users
+    :param feature_extractors:  list of feature extractors, in the order their features appear in the row vectors
+    :param use_cache:           whether cached feature values should be used
+    :param include_labels:      if True, the true class (1: swiss, 0: not swiss) is added as the last column
+    :param chunk_size:          number of samples per chunk
+    :return:                    2-dimensional numpy array with one row vector per sample
+    """
+    feature_vectors = []
+    for start in range(0, len(sample_set), chunk_size):
+        feature_vectors.extend(_build_feature_vectors(sample_set[start:(start + chunk_size)], feature_extractors,
+                                                      use_cache, include_labels))
+    return np.array(feature_vectors)
+
+
+def _build_feature_vectors(sample_set, feature_extractors, use_cache, include_labels):
+    sample_contexts = UserContext.create_many(sample_set, feature_extractors)
+    feature_columns = [fe.extract_for_many(sample_contexts, use_cache) for fe in feature_extractors]
+    feature_vectors = []
+    for i, sample in enumerate(sample_set):
+        feature_vec = np.array([])
+        for feature_column in feature_columns:
+            feature_vec = np.append(feature_vec, feature_column[i])
+        if include_labels:
+            feature_vec = np.append(feature_vec, (1 if sample["is_swiss"] else 0))
+        feature_vectors.append(feature_vec)
+    return feature_vectors
+
+
+def build_feature_matrix_parallel(sample_set, feature_extractors, use_cache, num_workers, chunk_size,
+                                  include_labels=True):
+    """
+    Same as build_feature_matrix(), but splits the sample set into chunks which are processed by a pool of worker
+    processes. Each worker process has its own MongoDB connection and its own copy of the feature extractors. The rows
+    of the resulting matrix are in the same order as the samples in sample_set.
+    :param num_workers: number of worker processes
+    :param chunk_size:  number of samples per chunk
+    """
+    chunks = [sample_set[i:(i + chunk_size)] for i in range(0, len(sample_set), chunk_size)]
+    # feature extractors are unpickled by the worker itself, after it has loaded the config (see _init_worker())
+    serialized_extractors = pickle.dumps(feature_extractors)
+    mp_context = multiprocessing.get_context("spawn")  # don't share MongoDB connections with forked processes
+    feature_vectors = []
+    with mp_context.Pool(num_workers, initializer=_init_worker,
+                         initargs=(context.get_loaded_config(), serialized_extractors, use_cache)) as pool:
+        with tqdm(total=len(sample_set)) as progress:
+            for chunk_matrix in pool.imap(_build_chunk_matrix, [(chunk, include_labels) for chunk in chunks]):
+                feature_vectors.extend(chunk_matrix)
+                progress.update(len(chunk_matrix))
+    return np.array(feature_vectors)
+
+
+def _init_worker(config, serialized_extractors, use_cache):
+    global _worker_feature_extractors, _worker_use_cache
+    context.set_config(config)
+    FeatureExtractor.set_progress_reporting(False)  # progress is reported by the parent process
+    _worker_feature_extractors = pickle.loads(serialized_extractors)
+    _worker_use_cache = use_cache
+
+
+def _build_chunk_matrix(chunk_args):
+    chunk, include_labels = chunk_args
+    return build_feature_matrix(chunk, _worker_feature_extractors, _worker_use_cache, include_labels, len(chunk))
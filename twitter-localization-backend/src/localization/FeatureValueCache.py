@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from src.util import context
+
+# guards the creation of the shared cache instance
+_instance_lock = Lock()
+
+
+class FeatureValueCache:
+    """
+    Process-wide in-memory cache tier for feature values, sitting between FeatureExtractor#extract_for and the
+    feature_cache collection. Entries are keyed by (feature extractor cache key, user ID). The cache is bounded in size and
+    evicts the least recently used entry first; entries can optionally expire after a time to live.
+    """
+
+    _instance = None
+
+    def __init__(self, max_size=10000, ttl_seconds=None):
+        """
+        :param max_size:    maximum number of cached feature values, 0 disables the cache
+        :param ttl_seconds: seconds after which a cached value expires, None for no expiry
+        """
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def instance():
+        if FeatureValueCache._instance is None:
+            with _instance_lock:
+                if FeatureValueCache._instance is None:
+                    settings = context.get_config("feature_cache_memory")
+                    max_size = settings.get("max_size", 10000) if settings.get("enabled", True) else 0
+                    FeatureValueCache._instance = FeatureValueCache(max_size, settings.get("ttl_seconds", None))
+        return FeatureValueCache._instance
+
+    def get(self, cache_key, user_id):
+        """
+        Get a cached feature value, and mark it as most recently used
+        :return: cached feature value, None if the value is not cached or has expired
+        """
+        key = (cache_key, user_id)
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if (entry is not None) and self._is_expired(entry):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, cache_key, user_id, feature_value):
+        if (self._max_size <= 0) or (feature_value is None):
+            return
+        key = (cache_key, user_id)
+        with self._lock:
+            self._entries[key] = (feature_value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, cache_key, user_id):
+        with self._lock:
+            self._entries.pop((cache_key, user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """
+        :return: dictionary with the number of hits and misses since startup, and the current size of the cache
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "ttl_seconds": self._ttl_seconds
+            }
+
+    def _is_expired(self, entry):
+        if self._ttl_seconds is None:
+            return False
+        return (time.monotonic() - entry[1]) > self._ttl_seconds
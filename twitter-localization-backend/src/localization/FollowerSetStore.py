@@ -0,0 +1,89 @@
+import os
+from threading import Lock
+
+from src.localization.Database import Database
+from src.localization.SortedIdSet import SortedIdSet
+from src.util import context, paths, timing
+
+
+class FollowerSetStore:
+    """
+    Process-wide store of influencer follower sets (see SortedIdSet). Each influencer's followerIds array is converted
+    into a sorted ID set once and saved as <influencer ID>.npy in the directory given by the "follower_sets_dir" config
+    key, from where it is memory mapped on later use. Follower sets need to be updated whenever an influencer's
+    followerIds change (see UserManager#fetch_influencer_follower_ids).
+    """
+
+    _instance = None
+
+    def __init__(self, directory):
+        """
+        :param directory: absolute path of the directory the follower set files are stored in
+        """
+        self._db = Database.instance()
+        self._directory = directory
+        self._follower_sets = {}
+        self._lock = Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def instance():
+        if FollowerSetStore._instance is None:
+            directory = paths.convert_project_relative_path(context.get_config("follower_sets_dir"))
+            FollowerSetStore._instance = FollowerSetStore(directory)
+        return FollowerSetStore._instance
+
+    def get(self, influencer_user):
+        """
+        Get an influencer's follower set, creating its file from the influencer's followerIds if it does not exist yet
+        :param influencer_user: influencer user document, with or without the followerIds field
+        :return:                SortedIdSet, empty if no follower IDs have been collected for this influencer
+        """
+        influencer_id = influencer_user["id"]
+        follower_set = self._follower_sets.get(influencer_id, None)
+        if follower_set is not None:
+            return follower_set
+        with self._lock:
+            if influencer_id not in self._follower_sets:
+                path = self._get_path(influencer_id)
+                if not os.path.exists(path):
+                    follower_ids = influencer_user.get("followerIds", None)
+                    if follower_ids is None:
+                        follower_ids = self._load_follower_ids(influencer_id)
+                    self._save(influencer_id, follower_ids)
+                self._follower_sets[influencer_id] = SortedIdSet.load(path)
+            return self._follower_sets[influencer_id]
+
+    def get_all(self):
+        """
+        :return: list with the follower set of every influencer whose follower IDs have been collected
+        """
+        influencers_cursor = self._db.users_mongodb.find({"type": "influencer", "followerIds": {"$exists": True}},
+                                                         {"_id": 0, "id": 1})
+        return [self.get(influencer_user) for influencer_user in influencers_cursor]
+
+    def update(self, influencer_id, follower_ids):
+        """
+        Replace an influencer's follower set, e.g. after the influencer's followerIds have been fetched again
+        :param follower_ids: list of the influencer's follower IDs
+        """
+        with self._lock:
+            self._follower_sets.pop(influencer_id, None)
+            self._save(influencer_id, follower_ids)
+
+    def _load_follower_ids(self, influencer_id):
+        influencer_user = self._db.users_mongodb.find_one({"id": influencer_id}, {"_id": 0, "followerIds": 1})
+        if influencer_user is None:
+            return []
+        return influencer_user.get("followerIds", [])
+
+    def _save(self, influencer_id, follower_ids):
+        print(timing.get_timestamp() + ": FollowerSetStore: saving {} follower IDs of influencer {}"
+              .format(len(follower_ids), influencer_id))
+        # write to a temporary file first, the old file may still be memory mapped by this or another process
+        temporary_path = self._get_path(influencer_id) + ".tmp.npy"
+        SortedIdSet(follower_ids).save(temporary_path)
+        os.replace(temporary_path, self._get_path(influencer_id))
+
+    def _get_path(self, influencer_id):
+        return os.path.join(self._directory, "{}.npy".format(influencer_id))
@@ -0,0 +1,216 @@
+from threading import Lock
+
+import unidecode
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from src.localization.Database import Database
+from src.util import collections
+
+
+class HashtagHistogramStore:
+    """
+    Materialized per-user hashtag histograms. Normalized hashtags are interned as integer IDs in the
+    hashtag_vocabulary collection ({hashtag, hashtag_id}), and each user's histogram is stored in the
+    hashtag_histograms collection as a sparse count vector {_id: user ID, counts: {<hashtag ID>: count}}. A user has a
+    histogram document if and only if the histogram covers all of the user's tweets; users whose tweets were collected
+    before histograms existed have no document, and are materialized from their tweets on first use.
+    """
+
+    _instance = None
+
+    # _id of the document in the vocabulary collection which holds the next free hashtag ID
+    _COUNTER_ID = "next_hashtag_id"
+
+    # maximum number of user IDs per $in query
+    _QUERY_CHUNK_SIZE = 1000
+
+    def __init__(self):
+        self._db = Database.instance()
+        self._db.hashtag_vocabulary.create_index("hashtag", unique=True, sparse=True)
+        self._db.hashtag_vocabulary.create_index("hashtag_id", unique=True, sparse=True)
+        self._hashtag_ids = {}
+        self._hashtags = {}
+        self._vocabulary_lock = Lock()
+
+    @staticmethod
+    def instance():
+        if HashtagHistogramStore._instance is None:
+            HashtagHistogramStore._instance = HashtagHistogramStore()
+        return HashtagHistogramStore._instance
+
+    @staticmethod
+    def normalize_hashtag(hashtag):
+        return unidecode.unidecode(hashtag).lower()
+
+    @staticmethod
+    def count_hashtags(tweets):
+        """
+        :param tweets:  list of tweet documents with (at least) the entities.hashtags field
+        :return:        dictionary mapping each normalized hashtag used in the tweets to its number of occurrences
+        """
+        hashtag_counts = {}
+        for tweet in tweets:
+            for hashtag in tweet["entities"]["hashtags"]:
+                n_hashtag = HashtagHistogramStore.normalize_hashtag(hashtag["text"])
+                hashtag_counts[n_hashtag] = hashtag_counts.get(n_hashtag, 0) + 1
+        return hashtag_counts
+
+    def add_tweets(self, user_id, tweets):
+        """
+        Incrementally adds the hashtags of newly collected tweets to a user's histogram. Only existing histograms are
+        updated: a histogram created from the new tweets alone would miss the hashtags of the user's earlier tweets,
+        so users without a histogram are materialized from all of their tweets on first use (see materialize()).
+        :param user_id: ID of the tweets' author
+        :param tweets:  list of tweet documents, as inserted into the tweets collection
+        """
+        hashtag_counts = HashtagHistogramStore.count_hashtags(tweets)
+        if len(hashtag_counts) == 0:
+            return
+        hashtag_ids = self._intern(hashtag_counts.keys())
+        self._db.hashtag_histograms.update_one({"_id": user_id},
+                                               {"$inc": {"counts." + str(hashtag_ids[hashtag]): count
+                                                         for hashtag, count in hashtag_counts.items()}})
+
+    def set_histograms(self, hashtag_counts_by_user):
+        """
+        Replaces the histograms of the given users
+        :param hashtag_counts_by_user: dictionary mapping user IDs to dictionaries {normalized hashtag: count}
+        """
+        all_hashtags = set([])
+        for hashtag_counts in hashtag_counts_by_user.values():
+            all_hashtags.update(hashtag_counts.keys())
+        hashtag_ids = self._intern(all_hashtags)
+        operations = []
+        for user_id, hashtag_counts in hashtag_counts_by_user.items():
+            counts = {str(hashtag_ids[hashtag]): count for hashtag, count in hashtag_counts.items()}
+            operations.append(UpdateOne({"_id": user_id}, {"$set": {"counts": counts}}, upsert=True))
+        if len(operations) > 0:
+            self._db.hashtag_histograms.bulk_write(operations, ordered=False)
+
+    def get_histograms(self, user_ids):
+        """
+        :param user_ids:    list of user IDs
+        :return:            dictionary mapping the ID of each user with a materialized histogram to a dictionary
+                            {normalized hashtag: count}
+        """
+        histograms = {}
+        for chunk in collections.split_list_into_chunks(list(user_ids), HashtagHistogramStore._QUERY_CHUNK_SIZE):
+            for histogram in self._db.hashtag_histograms.find({"_id": {"$in": chunk}}):
+                histograms[histogram["_id"]] = histogram["counts"]
+        hashtags = self._resolve([int(hashtag_id) for counts in histograms.values() for hashtag_id in counts.keys()])
+        return {user_id: {hashtags[int(hashtag_id)]: count for hashtag_id, count in counts.items()}
+                for user_id, counts in histograms.items()}
+
+    def materialize(self, user_ids):
+        """
+        Creates the missing histograms of the given users from their tweets, with a single aggregation which only reads
+        the tweets' hashtags
+        :param user_ids: list of user IDs
+        """
+        existing_ids = set([histogram["_id"] for histogram in
+                            self._db.hashtag_histograms.find({"_id": {"$in": list(user_ids)}}, {"_id": 1})])
+        missing_ids = [user_id for user_id in set(user_ids) if user_id not in existing_ids]
+        if len(missing_ids) == 0:
+            return
+        hashtag_counts_by_user = {user_id: {} for user_id in missing_ids}
+        for (author_id, hashtag), count in self._aggregate_tweet_hashtags(missing_ids, per_author=True).items():
+            n_hashtag = HashtagHistogramStore.normalize_hashtag(hashtag)
+            hashtag_counts = hashtag_counts_by_user[author_id]
+            hashtag_counts[n_hashtag] = hashtag_counts.get(n_hashtag, 0) + count
+        self.set_histograms(hashtag_counts_by_user)
+
+    def get_top_hashtags(self, user_ids, limit):
+        """
+        Ranks the hashtags used by a group of users, by summing up their histograms on MongoDB. Users without a
+        histogram are ignored (see materialize()).
+        :param user_ids:    list of user IDs
+        :param limit:       maximum number of hashtags to return
+        :return:            list of (normalized hashtag, total count) tuples, sorted by descending count; ties are
+                            broken alphabetically
+        """
+        cursor = self._db.hashtag_histograms.aggregate([
+            {"$match": {"_id": {"$in": list(user_ids)}}},
+            {"$project": {"counts": {"$objectToArray": "$counts"}}},
+            {"$unwind": "$counts"},
+            {"$group": {"_id": "$counts.k", "count": {"$sum": "$counts.v"}}},
+            {"$addFields": {"hashtag_id": {"$toInt": "$_id"}}},
+            {"$lookup": {"from": self._db.hashtag_vocabulary.name, "localField": "hashtag_id",
+                         "foreignField": "hashtag_id", "as": "vocabulary_entry"}},
+            {"$project": {"_id": 0, "count": 1, "hashtag": {"$arrayElemAt": ["$vocabulary_entry.hashtag", 0]}}},
+            {"$sort": {"count": -1, "hashtag": 1}},
+            {"$limit": limit}
+        ], allowDiskUse=True)
+        return [(entry["hashtag"], entry["count"]) for entry in cursor]
+
+    def count_hashtags_of_authors(self, author_ids):
+        """
+        Counts the normalized hashtags in the tweets of a group of users, without using histograms. Hashtags are
+        grouped on MongoDB by their original text, and then merged by their normalized form.
+        :param author_ids:  list of user IDs
+        :return:            dictionary mapping each normalized hashtag to its number of occurrences
+        """
+        hashtag_counts = {}
+        for hashtag, count in self._aggregate_tweet_hashtags(author_ids, per_author=False).items():
+            n_hashtag = HashtagHistogramStore.normalize_hashtag(hashtag)
+            hashtag_counts[n_hashtag] = hashtag_counts.get(n_hashtag, 0) + count
+        return hashtag_counts
+
+    def _aggregate_tweet_hashtags(self, author_ids, per_author):
+        """
+        :return: dictionary mapping each original hashtag text (or each (author ID, hashtag text) tuple, if per_author)
+                 to its number of occurrences in the tweets of the given authors
+        """
+        group_id = {"author_id": "$author_id", "hashtag": "$hashtag"} if per_author else "$hashtag"
+        cursor = self._db.tweets_mongodb.aggregate([
+            {"$match": {"author_id": {"$in": list(author_ids)}}},
+            {"$project": {"_id": 0, "author_id": 1, "hashtag": "$entities.hashtags.text"}},
+            {"$unwind": "$hashtag"},
+            {"$group": {"_id": group_id, "count": {"$sum": 1}}}
+        ], allowDiskUse=True)
+        if per_author:
+            return {(entry["_id"]["author_id"], entry["_id"]["hashtag"]): entry["count"] for entry in cursor}
+        return {entry["_id"]: entry["count"] for entry in cursor}
+
+    def _intern(self, hashtags):
+        """
+        :param hashtags:    iterable of normalized hashtags
+        :return:            dictionary mapping each hashtag to its ID, adding hashtags to the vocabulary if needed
+        """
+        with self._vocabulary_lock:
+            new_hashtags = [hashtag for hashtag in set(hashtags) if hashtag not in self._hashtag_ids]
+            if len(new_hashtags) > 0:
+                self._load_vocabulary({"hashtag": {"$in": new_hashtags}})
+                new_hashtags = [hashtag for hashtag in new_hashtags if hashtag not in self._hashtag_ids]
+            if len(new_hashtags) > 0:
+                self._add_to_vocabulary(new_hashtags)
+            return {hashtag: self._hashtag_ids[hashtag] for hashtag in hashtags}
+
+    def _resolve(self, hashtag_ids):
+        """
+        :param hashtag_ids: iterable of hashtag IDs
+        :return:            dictionary mapping each hashtag ID to its hashtag
+        """
+        with self._vocabulary_lock:
+            unknown_ids = list(set([hashtag_id for hashtag_id in hashtag_ids if hashtag_id not in self._hashtags]))
+            if len(unknown_ids) > 0:
+                self._load_vocabulary({"hashtag_id": {"$in": unknown_ids}})
+            return {hashtag_id: self._hashtags[hashtag_id] for hashtag_id in hashtag_ids}
+
+    def _add_to_vocabulary(self, new_hashtags):
+        # reserve a range of IDs, so that concurrent writers never assign the same ID to different hashtags
+        counter = self._db.hashtag_vocabulary.find_one_and_update({"_id": HashtagHistogramStore._COUNTER_ID},
+                                                                   {"$inc": {"next_id": len(new_hashtags)}},
+                                                                   upsert=True, return_document=ReturnDocument.AFTER)
+        first_id = counter["next_id"] - len(new_hashtags)
+        entries = [{"hashtag": hashtag, "hashtag_id": first_id + i} for i, hashtag in enumerate(new_hashtags)]
+        try:
+            self._db.hashtag_vocabulary.insert_many(entries, ordered=False)
+        except BulkWriteError:
+            pass  # some hashtags were added concurrently by another writer, their IDs are loaded below
+        self._load_vocabulary({"hashtag": {"$in": new_hashtags}})
+
+    def _load_vocabulary(self, query):
+        for entry in self._db.hashtag_vocabulary.find(query, {"_id": 0, "hashtag": 1, "hashtag_id": 1}):
+            self._hashtag_ids[entry["hashtag"]] = entry["hashtag_id"]
+            self._hashtags[entry["hashtag_id"]] = entry["hashtag"]
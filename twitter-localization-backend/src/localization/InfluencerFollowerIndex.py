@@ -0,0 +1,73 @@
+from src.localization.Database import Database
+from src.util import collections, timing
+
+
+class InfluencerFollowerIndex:
+    """
+    Inverted index from Twitter user ID to the number of influencers this user follows, stored in the
+    influencer_follower_index collection as one document {_id: user ID, influencer_count: n} per user following at
+    least one influencer. The index is derived from the followerIds arrays of all influencers in the users
+    collection, and needs to be rebuilt whenever these change (see UserManager#fetch_influencer_follower_ids).
+    """
+
+    _instance = None
+
+    # maximum number of user IDs per $in query
+    _QUERY_CHUNK_SIZE = 1000
+
+    def __init__(self):
+        self._db = Database.instance()
+        # whether the index is known to exist, it is only built on the first lookup if the collection is empty
+        self._is_built = False
+
+    @staticmethod
+    def instance():
+        if InfluencerFollowerIndex._instance is None:
+            InfluencerFollowerIndex._instance = InfluencerFollowerIndex()
+        return InfluencerFollowerIndex._instance
+
+    def rebuild(self):
+        """
+        Rebuild the index from the followerIds arrays of all influencers. The aggregation replaces the index collection
+        atomically once it is complete, so lookups can be performed while the index is being rebuilt.
+        """
+        print(timing.get_timestamp() + ": InfluencerFollowerIndex: rebuilding index")
+        self._db.users_mongodb.aggregate([
+            {"$match": {"type": "influencer", "followerIds": {"$exists": True}}},
+            {"$project": {"_id": 0, "followerIds": 1}},
+            {"$unwind": "$followerIds"},
+            {"$group": {"_id": "$followerIds", "influencer_count": {"$sum": 1}}},
+            {"$out": self._db.influencer_follower_index.name}
+        ], allowDiskUse=True)
+        num_entries = self._db.influencer_follower_index.estimated_document_count()
+        self._is_built = True
+        print(timing.get_timestamp() + ": InfluencerFollowerIndex: index rebuilt, {} entries".format(num_entries))
+
+    def get_influencer_count(self, user_id):
+        """
+        :return: number of influencers followed by the user with the given ID
+        """
+        self._ensure_built()
+        entry = self._db.influencer_follower_index.find_one({"_id": user_id}, {"influencer_count": 1})
+        if entry is None:
+            return 0
+        return entry["influencer_count"]
+
+    def get_influencer_counts(self, user_ids):
+        """
+        :return: dictionary mapping each of the given user IDs to the number of influencers followed by that user
+        """
+        self._ensure_built()
+        counts = dict([(user_id, 0) for user_id in user_ids])
+        chunks = collections.split_list_into_chunks(list(counts.keys()), InfluencerFollowerIndex._QUERY_CHUNK_SIZE)
+        for chunk in chunks:
+            for entry in self._db.influencer_follower_index.find({"_id": {"$in": chunk}}):
+                counts[entry["_id"]] = entry["influencer_count"]
+        return counts
+
+    def _ensure_built(self):
+        if self._is_built:
+            return
+        if self._db.influencer_follower_index.estimated_document_count() == 0:
+            self.rebuild()
+        self._is_built = True
@@ -0,0 +1,64 @@
+from threading import Lock
+
+import spacy
+
+from src.util import timing
+
+
+# spaCy model used for each supported tweet language
+SPACY_MODEL_NAMES = {
+    "de": "de_core_news_sm",
+    "fr": "fr_core_news_sm",
+    "it": "it_core_news_sm",
+    "en": "en_core_web_sm"
+}
+
+# process-wide registry of loaded spaCy models, shared among all feature extractors
+_models = {}
+_models_lock = Lock()
+
+
+def get_model(lang):
+    """
+    Get the spaCy model for a tweet language, loading it the first time this language is requested
+    :param lang: tweet language code, e.g. "de"
+    :return: spaCy model, None if the language is not supported
+    """
+    if lang not in SPACY_MODEL_NAMES:
+        return None
+    model = _models.get(lang, None)
+    if model is not None:
+        return model
+    with _models_lock:
+        if lang not in _models:
+            print(timing.get_timestamp() + ": LanguageModels: loading spaCy model " + SPACY_MODEL_NAMES[lang])
+            _models[lang] = spacy.load(SPACY_MODEL_NAMES[lang])
+        return _models[lang]
+
+
+def preload(languages):
+    """
+    Load the spaCy models for the given languages up front, e.g. to avoid a delay on the first request
+    :param languages: list of tweet language codes
+    """
+    for lang in languages:
+        get_model(lang)
+
+
+def get_resident_languages():
+    """
+    :return: sorted list of the languages whose spaCy models are currently loaded in this process
+    """
+    return sorted(_models.keys())
+
+
+def get_model_name(lang):
+    """
+    :param lang: tweet language code, e.g. "de"
+    :return: name of the spaCy model used for this language, None if the language is not supported
+    """
+    return SPACY_MODEL_NAMES.get(lang, None)
+
+
+def is_supported(lang):
+    return lang in SPACY_MODEL_NAMES
@@ -1,8 +1,17 @@
-from src.util import timing
+import copy
+import traceback
+from threading import Lock
+
+import numpy as np
+
+from src.util import context, timing
 from src.localization.MetamodelNotReadyError import MetamodelNotReadyError
 from src.localization.Database import Database
 from src.twitter.TwitterApiBinding import TwitterApiBinding
 from src.crawler.UserManager import UserManager
+from src.localization import FeatureMatrix
+from src.localization import MetamodelArtifacts
+from src.localization import TrainValidateTestProvider
 from src.localization import LocalizationConstants
 
 
@@ -19,6 +28,33 @@ class Metamodel:
         self._model_id = model_name.replace(" ", "_").lower()
         self._model_instance_id = self._model_id + "_" + timing.get_millis_timestamp()
         self._training_scores = []
+        # training data of the classifier, kept for incremental updates (see update())
+        self._train_matrix = None
+        self._validate_matrix = None
+        self._trained_user_ids = set([])
+        # update() trains a copy of the classifier, which is swapped in together with its training data under
+        # _classifier_lock, so that classifications never see a classifier in training; updates run one at a time
+        self._classifier_lock = Lock()
+        self._update_lock = Lock()
+        self._db = Database.instance()
+        self._twitter = TwitterApiBinding()
+        self._user_manager = UserManager(self._twitter)
+
+    def __getstate__(self):
+        # database and API connections and locks can't be pickled (e.g. to save built metamodels, see
+        # MetamodelArtifacts)
+        state = self.__dict__.copy()
+        del state["_classifier_lock"]
+        del state["_update_lock"]
+        del state["_db"]
+        del state["_twitter"]
+        del state["_user_manager"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._classifier_lock = Lock()
+        self._update_lock = Lock()
         self._db = Database.instance()
         self._twitter = TwitterApiBinding()
         self._user_manager = UserManager(self._twitter)
@@ -34,6 +70,55 @@ class Metamodel:
         print(timing.get_timestamp() + ": finished building model " + self._model_instance_id)
         return self._training_scores
 
+    def update(self, labeled_users=None):
+        """
+        Incrementally trains the built metamodel on newly labeled users: features are only extracted for users that
+        are not in the training set yet, and appended to the stored training matrix. The classifier learns from the
+        new rows alone if it supports it (see Classifier#update), otherwise it is refit from the stored matrix. A copy
+        of the classifier is trained, which replaces the current one once it is ready, so that the metamodel keeps
+        classifying meanwhile; the updated metamodel is then saved as an artifact (see MetamodelArtifacts). Reference
+        data of feature extractors (e.g. the Swiss hashtag vector of HashtagSimilarity) is not updated, a full build()
+        is needed for that.
+        :param labeled_users:   list of Twitter users with is_swiss field, defaults to all labeled users that are
+                                not part of the train, validation or test set (see
+                                TrainValidateTestProvider#get_unused_labeled_users)
+        :return:                validation score of the updated classifier, None if there were no new users
+        """
+        if not self._is_ready:
+            raise MetamodelNotReadyError(self._model_id)
+        with self._update_lock:
+            score = self._update(labeled_users)
+            if score is not None:
+                try:
+                    MetamodelArtifacts.save(self._get_artifact_name(), self)
+                except Exception:
+                    print(traceback.format_exc())  # the updated metamodel is used anyway, it is updated on restart
+        return score
+
+    def _update(self, labeled_users):
+        if labeled_users is None:
+            labeled_users = TrainValidateTestProvider.get_unused_labeled_users(self._trained_user_ids)
+        train, validate, test = TrainValidateTestProvider.get_data()
+        held_out_user_ids = set([user["id"] for user in validate + test])
+        new_users = [user for user in labeled_users
+                     if ("is_swiss" in user) and (user["id"] not in self._trained_user_ids)
+                     and (user["id"] not in held_out_user_ids)]
+        if len(new_users) == 0:
+            print(timing.get_timestamp() + ": model {} is up to date".format(self._model_instance_id))
+            return None
+        print(timing.get_timestamp() + ": updating model {} with {} new users"
+              .format(self._model_instance_id, len(new_users)))
+        new_matrix = self._extract_feature_matrix(new_users)
+        train_matrix = np.vstack([self._train_matrix, new_matrix])
+        clf = copy.deepcopy(self._clf)
+        score = clf.update(new_matrix, train_matrix, self._validate_matrix)
+        with self._classifier_lock:
+            self._clf = clf
+            self._train_matrix = train_matrix
+            self._trained_user_ids = self._trained_user_ids.union([user["id"] for user in new_users])
+            self._training_scores.append({clf.get_name(): score})
+        return score
+
     def classify(self, screen_name):
         if not self._is_ready:
             raise MetamodelNotReadyError(self._model_id)
@@ -46,6 +131,50 @@ class Metamodel:
         predicted_class, confidence = self._classify(twitter_user)
         return predicted_class, confidence
 
+    def classify_many(self, screen_names, batch_size=100):
+        """
+        Classifies many users by screen name. All screen names are resolved with a single query per user collection;
+        users that aren't in the database are fetched from the Twitter API batch by batch (see
+        UserManager#fetch_new_twitter_users), and each batch is classified with a single feature matrix and a single
+        call to the classifier. Results are yielded as soon as their batch is classified.
+        :param screen_names:    list of screen names
+        :param batch_size:      number of users classified at once
+        :return:                generator of (screen name, predicted class, confidence) tuples, in the same order as
+                                screen_names; class and confidence are None for users that don't exist
+        """
+        if not self._is_ready:
+            raise MetamodelNotReadyError(self._model_id)
+        local_users = self._user_manager.find_local_twitter_users(screen_names)
+        print(timing.get_timestamp() + ": localizing {} users, {} found locally"
+              .format(len(screen_names), len(local_users)))
+        for start in range(0, len(screen_names), batch_size):
+            batch = screen_names[start:(start + batch_size)]
+            users = dict([(screen_name, local_users[screen_name]) for screen_name in batch
+                          if screen_name in local_users])
+            missing = [screen_name for screen_name in set(batch) if screen_name not in users]
+            if len(missing) > 0:
+                users.update(self._user_manager.fetch_new_twitter_users(missing))
+            found = [screen_name for screen_name in set(batch) if screen_name in users]
+            results = dict(zip(found, self.classify_users([users[screen_name] for screen_name in found])))
+            for screen_name in batch:
+                predicted_class, confidence = results.get(screen_name, (None, None))
+                yield screen_name, predicted_class, confidence
+
+    def classify_users(self, twitter_users):
+        """
+        Classifies many users at once, with a single feature matrix and a single call to the classifier
+        :param twitter_users:   list of Twitter users, as stored in the users or users_test_set collection
+        :return:                list of (predicted class, confidence) tuples, in the same order as twitter_users
+        """
+        if not self._is_ready:
+            raise MetamodelNotReadyError(self._model_id)
+        if len(twitter_users) == 0:
+            return []
+        print(timing.get_timestamp() + ": localizing {} users".format(len(twitter_users)))
+        feature_matrix = self._build_feature_matrix(twitter_users, self._get_feature_extractors(), include_labels=False)
+        predicted_classes, confidences = self._get_classifier().classify_batch(feature_matrix)
+        return list(zip(predicted_classes.tolist(), confidences.tolist()))
+
     def get_model_name(self):
         return self._model_name
 
@@ -58,8 +187,104 @@ class Metamodel:
     def get_training_scores(self):
         return self._training_scores
 
+    @classmethod
+    def get_config(cls):
+        """
+        Describes the configuration of this metamodel class, i.e. its feature extractors and classifier, to tell apart
+        metamodels built with different configurations (see MetamodelArtifacts)
+        :return:    JSON-serializable dictionary
+        """
+        return {"metamodel_class": cls.__name__}
+
+    def get_feature_cache_keys(self):
+        """
+        :return:    cache keys of this metamodel's feature extractors (see FeatureExtractor#get_cache_key), None before
+                    the metamodel is built
+        """
+        feature_extractors = self._get_feature_extractors()
+        if feature_extractors is None:
+            return None
+        return [feature_extractor.get_cache_key() for feature_extractor in feature_extractors]
+
+    def on_artifact_loaded(self):
+        """
+        Called once this metamodel has been loaded from an artifact that matches the current configuration (see
+        MetamodelArtifacts#load), override to share state with other metamodels
+        """
+        pass
+
+    def get_training_matrices(self):
+        """
+        :return:    (train matrix, validation matrix) the classifier was trained on, new rows added by update()
+                    included; both None before the metamodel is built
+        """
+        return self._train_matrix, self._validate_matrix
+
+    def extract_feature_matrix(self, sample_set):
+        """
+        Builds the labeled feature matrix of this metamodel's features for a set of samples, e.g. the test set
+        :param sample_set:  list of Twitter users with an is_swiss field
+        :return:            2-dimensional numpy array with samples as row vectors, true class in the last column
+        """
+        if not self._is_ready:
+            raise MetamodelNotReadyError(self._model_id)
+        return self._extract_feature_matrix(sample_set)
+
+    def _extract_feature_matrix(self, sample_set):
+        """
+        Builds the labeled feature matrix of this metamodel's features for a set of samples
+        :param sample_set:  list of Twitter users with an is_swiss field
+        :return:            2-dimensional numpy array with samples as row vectors, true class in the last column
+        """
+        return self._build_feature_matrix(sample_set, self._get_feature_extractors())
+
+    def _train_classifier(self, train_set, train_matrix, validate_matrix):
+        """
+        Trains this metamodel's classifier and keeps its training data for incremental updates (see update())
+        :param train_set:       list of Twitter users the rows of train_matrix were extracted for
+        """
+        score = self._clf.train(train_matrix, validate_matrix)
+        self._train_matrix = train_matrix
+        self._validate_matrix = validate_matrix
+        self._trained_user_ids = set([user["id"] for user in train_set])
+        self._training_scores.append({self._clf.get_name(): score})
+
+    def _classify(self, twitter_user):
+        feature_vector = self._build_feature_matrix([twitter_user], self._get_feature_extractors(),
+                                                    include_labels=False)[0]
+        return self._get_classifier().classify(feature_vector)
+
+    def _get_classifier(self):
+        """
+        :return:    the current classifier, which update() replaces rather than retrains in place
+        """
+        with self._classifier_lock:
+            return self._clf
+
+    def _get_artifact_name(self):
+        """
+        :return:    name of this metamodel's artifact, its module name like the metamodel names of the API
+        """
+        return type(self).__module__.split(".")[-1]
+
+    def _build_feature_matrix(self, sample_set, feature_extractors, include_labels=True):
+        """
+        Builds a feature matrix for a set of samples (see FeatureMatrix#build_feature_matrix). Large sample sets are
+        split across a pool of worker processes if parallel feature extraction is enabled in the config.
+        """
+        settings = context.get_config("parallel_feature_extraction")
+        num_workers = settings.get("num_workers", 1)
+        chunk_size = settings.get("chunk_size", 50)
+        if (num_workers > 1) and (len(sample_set) > chunk_size):
+            print(timing.get_timestamp() + ": extracting features for {} samples with {} worker processes"
+                  .format(len(sample_set), num_workers))
+            return FeatureMatrix.build_feature_matrix_parallel(sample_set, feature_extractors, self._use_cache,
+                                                               num_workers, chunk_size, include_labels)
+        return FeatureMatrix.build_feature_matrix(sample_set, feature_extractors, self._use_cache, include_labels,
+                                                  chunk_size)
+
     def _build(self):
         raise NotImplementedError("function _build() is abstract in Model")
 
-    def _classify(self, twitter_user):
-        raise NotImplementedError("function _classify() is abstract in Model")
+    def _get_feature_extractors(self):
+        raise NotImplementedError("function _get_feature_extractors() is abstract in Model")
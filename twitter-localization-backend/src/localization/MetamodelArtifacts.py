@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import pickle
+
+from src.localization import TrainValidateTestProvider
+from src.util import context, paths, timing
+
+
+"""
+Saves fully built metamodels (classifier, feature extractors with their reference data, training scores) as artifacts
+in the directory given by the "metamodel_artifacts" config key, and loads them instead of rebuilding. An artifact is
+only loaded if it was built from the same TVT file content as the current one, by the same metamodel class with the
+same configuration: feature extractor and classifier specs (see Metamodel#get_config) and feature extractor cache
+keys (see FeatureExtractor#get_cache_key), which change with the extractors' cache versions. Metamodels built on
+randomized sets are never saved.
+"""
+
+# bump this version whenever metamodels or feature extractors change in a way that breaks previously saved artifacts
+_ARTIFACT_VERSION = 4
+
+
+def save(artifact_name, metamodel):
+    """
+    :param artifact_name:   name of the artifact, e.g. the metamodel's module name
+    :param metamodel:       built metamodel
+    :return:                True if the artifact was saved
+    """
+    tvt_hash = TrainValidateTestProvider.get_source_file_hash()
+    if (not _is_enabled()) or (tvt_hash is None):
+        return False
+    artifact = {
+        "artifact_version": _ARTIFACT_VERSION,
+        "tvt_hash": tvt_hash,
+        "metamodel_class": type(metamodel).__name__,
+        "config_hash": _get_config_hash(type(metamodel), metamodel),
+        "training_scores": metamodel.get_training_scores(),
+        "metamodel": metamodel
+    }
+    path = _get_path(artifact_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as outfile:
+        pickle.dump(artifact, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+    print(timing.get_timestamp() + ": MetamodelArtifacts: saved artifact " + path)
+    return True
+
+
+def load(artifact_name, metamodel_class):
+    """
+    :param artifact_name:   name of the artifact, as passed to save()
+    :param metamodel_class: Metamodel subclass the artifact is expected to contain
+    :return:                built metamodel, None if there is no artifact that matches the current TVT file, metamodel
+                            class and configuration
+    """
+    path = _get_path(artifact_name)
+    if (not _is_enabled()) or (not os.path.exists(path)):
+        return None
+    with open(path, "rb") as infile:
+        artifact = pickle.load(infile)
+    if artifact["artifact_version"] != _ARTIFACT_VERSION:
+        print(timing.get_timestamp() + ": MetamodelArtifacts: ignoring outdated artifact " + path)
+        return None
+    if artifact["tvt_hash"] != TrainValidateTestProvider.get_source_file_hash():
+        print(timing.get_timestamp() + ": MetamodelArtifacts: ignoring artifact built on other TVT data " + path)
+        return None
+    if artifact["metamodel_class"] != metamodel_class.__name__:
+        print(timing.get_timestamp() + ": MetamodelArtifacts: ignoring artifact of metamodel class {} {}"
+              .format(artifact["metamodel_class"], path))
+        return None
+    metamodel = artifact["metamodel"]
+    if artifact["config_hash"] != _get_config_hash(metamodel_class, metamodel):
+        print(timing.get_timestamp() + ": MetamodelArtifacts: ignoring artifact with another configuration " + path)
+        return None
+    metamodel.on_artifact_loaded()
+    print(timing.get_timestamp() + ": MetamodelArtifacts: loaded artifact " + path)
+    return metamodel
+
+
+def _get_config_hash(metamodel_class, metamodel):
+    """
+    :param metamodel_class: Metamodel subclass whose current configuration is hashed
+    :param metamodel:       built metamodel, whose feature extractors' cache keys are hashed
+    """
+    config = {"metamodel": metamodel_class.get_config(), "feature_cache_keys": metamodel.get_feature_cache_keys()}
+    serialized_config = json.dumps(config, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(serialized_config).hexdigest()
+
+
+def _is_enabled():
+    return context.get_config("metamodel_artifacts").get("enabled", True)
+
+
+def _get_path(artifact_name):
+    directory = paths.convert_project_relative_path(context.get_config("metamodel_artifacts")["dir"])
+    return os.path.join(directory, artifact_name + ".pickle")
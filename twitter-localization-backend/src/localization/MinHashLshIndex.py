@@ -0,0 +1,102 @@
+import zlib
+
+import numpy as np
+
+
+# Mersenne prime 2^61 - 1, modulus of the universal hash functions
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class MinHashLshIndex:
+    """
+    Index of sets (e.g. hashtag profiles) for approximate Jaccard similarity queries. Each indexed set is stored as a
+    MinHash signature of num_perm values; signatures are split into num_bands bands, and sets whose signatures agree
+    on all values of at least one band are candidates for a query (locality-sensitive hashing). Only candidates are
+    compared with the query, so queries take sub-linear time in the number of indexed sets. Sets with a Jaccard
+    similarity of s become candidates with probability 1 - (1 - s^r)^b, for b bands of r values each.
+    """
+
+    def __init__(self, num_perm=128, num_bands=64, seed=1):
+        """
+        :param num_perm:    number of hash functions, i.e. length of the signatures
+        :param num_bands:   number of LSH bands, must divide num_perm; more bands find less similar candidates
+        :param seed:        seed of the hash functions, indexes can only be compared if they use the same seed
+        """
+        if num_perm % num_bands != 0:
+            raise ValueError("num_perm ({}) must be a multiple of num_bands ({})".format(num_perm, num_bands))
+        self._num_perm = num_perm
+        self._num_bands = num_bands
+        self._rows_per_band = num_perm // num_bands
+        random_state = np.random.RandomState(seed)
+        self._a = random_state.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = random_state.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._signatures = {}
+        self._buckets = [{} for _ in range(0, num_bands)]
+
+    def compute_signature(self, items):
+        """
+        :param items:   iterable of strings
+        :return:        MinHash signature, numpy array of num_perm values; all values are maximal for an empty set
+        """
+        item_hashes = np.array([zlib.crc32(item.encode("utf-8")) for item in set(items)], dtype=np.uint64)
+        if len(item_hashes) == 0:
+            return np.full(self._num_perm, _MAX_HASH, dtype=np.uint64)
+        # one row per hash function, one column per item; a * x + b < 2^64 for 32 bit a, b and x
+        permuted = ((np.outer(self._a, item_hashes) + self._b[:, np.newaxis]) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=1)
+
+    def add(self, key, items):
+        """
+        Adds a set to the index, replacing the set previously added under the same key
+        :param key:     name of the set, e.g. a reference profile name
+        :param items:   iterable of strings
+        """
+        self.remove(key)
+        signature = self.compute_signature(items)
+        self._signatures[key] = signature
+        for band, band_key in enumerate(self._get_band_keys(signature)):
+            self._buckets[band].setdefault(band_key, set([])).add(key)
+
+    def remove(self, key):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, band_key in enumerate(self._get_band_keys(signature)):
+            self._buckets[band][band_key].discard(key)
+
+    def get_signature(self, key):
+        return self._signatures.get(key, None)
+
+    def query(self, items, top_k=None):
+        """
+        Finds the indexed sets most similar to a given set, among the candidates found via LSH
+        :param items:   iterable of strings
+        :param top_k:   maximum number of results, None for all candidates
+        :return:        list of (key, estimated Jaccard similarity) tuples, sorted by descending similarity; empty
+                        for an empty set
+        """
+        items = set(items)
+        if len(items) == 0:
+            return []
+        signature = self.compute_signature(items)
+        candidates = set([])
+        for band, band_key in enumerate(self._get_band_keys(signature)):
+            candidates.update(self._buckets[band].get(band_key, []))
+        results = [(key, MinHashLshIndex.estimate_jaccard(signature, self._signatures[key])) for key in candidates]
+        results = [result for result in sorted(results, key=lambda result: (-result[1], str(result[0])))
+                   if result[1] > 0]
+        if top_k is None:
+            return results
+        return results[0:top_k]
+
+    @staticmethod
+    def estimate_jaccard(signature, other_signature):
+        return float(np.count_nonzero(signature == other_signature)) / len(signature)
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _get_band_keys(self, signature):
+        return [signature[(band * self._rows_per_band):((band + 1) * self._rows_per_band)].tobytes()
+                for band in range(0, self._num_bands)]
@@ -0,0 +1,66 @@
+import hashlib
+
+import pymongo
+from pymongo import UpdateOne
+
+from src.localization.Database import Database
+from src.util import collections
+
+
+class NerResultCache:
+    """
+    Persistent cache of NER results for tweet texts, stored in the ner_cache collection. Results are keyed by the spaCy
+    model, the tweet language and a hash of the normalized tweet text, so that identical texts (e.g. retweets) are only
+    processed once, across users and across metamodel builds. The cached results are the normalized location entities
+    recognized in a text, before any stopword filtering or matching against Swiss places.
+    """
+
+    _instance = None
+
+    # maximum number of text hashes per $in query
+    _QUERY_CHUNK_SIZE = 1000
+
+    def __init__(self):
+        self._ner_cache = Database.instance().ner_cache
+        self._ner_cache.create_index([("model", pymongo.ASCENDING),
+                                      ("lang", pymongo.ASCENDING),
+                                      ("text_hash", pymongo.ASCENDING)], unique=True)
+
+    @staticmethod
+    def instance():
+        if NerResultCache._instance is None:
+            NerResultCache._instance = NerResultCache()
+        return NerResultCache._instance
+
+    @staticmethod
+    def normalize_text(text):
+        """
+        Normalizes a tweet text for NER: removes hash signs (so hashtags are treated as words) and collapses whitespace
+        """
+        return " ".join(text.replace("#", "").split())
+
+    @staticmethod
+    def hash_text(normalized_text):
+        return hashlib.sha1(normalized_text.encode("utf-8")).hexdigest()
+
+    def fetch_many(self, model_name, lang, text_hashes):
+        """
+        :return: dictionary mapping each cached text hash to the list of locations recognized in that text
+        """
+        results = {}
+        for chunk in collections.split_list_into_chunks(list(text_hashes), NerResultCache._QUERY_CHUNK_SIZE):
+            cursor = self._ner_cache.find({"model": model_name, "lang": lang, "text_hash": {"$in": chunk}},
+                                          {"text_hash": 1, "locations": 1})
+            for cached_result in cursor:
+                results[cached_result["text_hash"]] = cached_result["locations"]
+        return results
+
+    def store_many(self, model_name, lang, locations_by_hash):
+        """
+        :param locations_by_hash: dictionary mapping text hashes to the list of locations recognized in that text
+        """
+        operations = [UpdateOne({"model": model_name, "lang": lang, "text_hash": text_hash},
+                                {"$set": {"locations": locations}}, upsert=True)
+                      for text_hash, locations in locations_by_hash.items()]
+        if len(operations) > 0:
+            self._ner_cache.bulk_write(operations, ordered=False)
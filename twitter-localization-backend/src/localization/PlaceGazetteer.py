@@ -0,0 +1,66 @@
+import re
+
+import unidecode
+
+
+# marks the end of a place name in the token trie
+_NAME_END = None
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class PlaceGazetteer:
+    """
+    Finds place names in texts without NER. Place names are compiled into a token trie (one edge per word of the
+    normalized name), so that multi-word names like "la chaux-de-fonds" are matched as a whole, and a text is scanned
+    in a single pass over its words. Names and texts are normalized the same way (unidecode, lower case), and matches
+    are only found on word boundaries.
+    """
+
+    def __init__(self, place_names):
+        """
+        :param place_names: iterable of place names, matches are reported as these names
+        """
+        self._trie = {}
+        self._max_name_length = 0
+        self._num_names = 0
+        for place_name in place_names:
+            self.add(place_name)
+
+    @staticmethod
+    def tokenize(text):
+        return _TOKEN_PATTERN.findall(unidecode.unidecode(text).lower())
+
+    def add(self, place_name):
+        name_tokens = PlaceGazetteer.tokenize(place_name)
+        if len(name_tokens) == 0:
+            return
+        node = self._trie
+        for token in name_tokens:
+            node = node.setdefault(token, {})
+        if _NAME_END not in node:
+            self._num_names += 1
+        node[_NAME_END] = place_name
+        self._max_name_length = max(self._max_name_length, len(name_tokens))
+
+    def find_places(self, text):
+        """
+        Finds all place names contained in a text, including names that are part of longer names (e.g. both
+        "rapperswil" and "rapperswil-jona")
+        :param text: text to scan, e.g. a tweet
+        :return: set of place names found in the text
+        """
+        tokens = PlaceGazetteer.tokenize(text)
+        places = set([])
+        for start in range(0, len(tokens)):
+            node = self._trie
+            for token in tokens[start:(start + self._max_name_length)]:
+                node = node.get(token, None)
+                if node is None:
+                    break
+                if _NAME_END in node:
+                    places.add(node[_NAME_END])
+        return places
+
+    def __len__(self):
+        return self._num_names
@@ -0,0 +1,52 @@
+"""
+Functions that partition users into reference groups, e.g. to build one hashtag profile per group (see
+HashtagProfileMatch). Each function returns a dictionary {group name: list of user IDs}; group names are prefixed with
+the kind of grouping (e.g. "canton:ZH"), so that groupings can be merged into one dictionary.
+"""
+
+from src.localization.Database import Database
+
+
+def by_language(twitter_users):
+    """
+    :param twitter_users:   list of Twitter users
+    :return:                one group per user interface language, users without a language are skipped
+    """
+    groups = {}
+    for twitter_user in twitter_users:
+        if twitter_user.get("lang", None) is not None:
+            groups.setdefault("lang:" + twitter_user["lang"], []).append(twitter_user["id"])
+    return groups
+
+
+def by_canton(twitter_users):
+    """
+    :param twitter_users:   list of Twitter users
+    :return:                one group per canton, for the Swiss users whose location was matched to a GeoNames place
+    """
+    geonames_ids = {}
+    for twitter_user in twitter_users:
+        geonames_id = twitter_user.get("user_place", {}).get("geonames_id", None)
+        if twitter_user.get("is_swiss", False) and (geonames_id is not None):
+            geonames_ids[twitter_user["id"]] = geonames_id
+    places_cursor = Database.instance().geonames_places_mongodb.find(
+        {"geonames_id": {"$in": list(set(geonames_ids.values()))}, "country_code": "CH"},
+        {"_id": 0, "geonames_id": 1, "state_code": 1})
+    state_codes = {place["geonames_id"]: place["state_code"] for place in places_cursor}
+    groups = {}
+    for user_id, geonames_id in geonames_ids.items():
+        if geonames_id in state_codes:
+            groups.setdefault("canton:" + state_codes[geonames_id], []).append(user_id)
+    return groups
+
+
+def by_influencer_category():
+    """
+    :return: one group per influencer category, with all influencers of that category
+    """
+    influencers_cursor = Database.instance().users_mongodb.find({"type": "influencer"},
+                                                                {"_id": 0, "id": 1, "influencer_category": 1})
+    groups = {}
+    for influencer in influencers_cursor:
+        groups.setdefault("category:" + influencer["influencer_category"], []).append(influencer["id"])
+    return groups
@@ -0,0 +1,82 @@
+import numpy as np
+
+
+class SortedIdSet:
+    """
+    Compact, immutable set of Twitter user IDs, stored as a sorted numpy array of unsigned 64 bit integers (8 bytes per
+    ID, compared to roughly 60 bytes per ID in a Python set). Membership tests are vectorized binary searches. Sets can
+    be saved to .npy files and loaded as memory maps, so that only the pages touched by a query are read from disk.
+    """
+
+    DTYPE = np.uint64
+
+    def __init__(self, ids=(), is_sorted=False):
+        """
+        :param ids:         iterable or numpy array of user IDs, may contain duplicates
+        :param is_sorted:   if True, ids must already be a sorted numpy array without duplicates, and is used as is
+        """
+        if is_sorted:
+            self._ids = ids
+        else:
+            self._ids = np.unique(SortedIdSet._to_array(ids))
+
+    @staticmethod
+    def load(path, memory_mapped=True):
+        """
+        Load a set saved with SortedIdSet#save
+        :param path:            path to the .npy file
+        :param memory_mapped:   if True, the file is memory mapped read-only instead of being read into memory
+        """
+        return SortedIdSet(np.load(path, mmap_mode=("r" if memory_mapped else None)), is_sorted=True)
+
+    def save(self, path):
+        np.save(path, self._ids)
+
+    def contains(self, user_id):
+        return bool(self.contains_many([user_id])[0])
+
+    def contains_many(self, user_ids):
+        """
+        :param user_ids:    iterable or numpy array of user IDs
+        :return:            numpy array of booleans, True for each of the given IDs which is in this set
+        """
+        queried_ids = SortedIdSet._to_array(user_ids)
+        if len(self._ids) == 0:
+            return np.zeros(len(queried_ids), dtype=bool)
+        positions = np.searchsorted(self._ids, queried_ids)
+        positions[positions == len(self._ids)] = 0
+        return self._ids[positions] == queried_ids
+
+    def count_contained(self, user_ids):
+        """
+        :return: number of the given user IDs which are in this set
+        """
+        return int(np.count_nonzero(self.contains_many(user_ids)))
+
+    def difference(self, other):
+        """
+        :param other:   SortedIdSet
+        :return:        SortedIdSet with the IDs in this set which are not in other
+        """
+        return SortedIdSet(np.setdiff1d(self._ids, other._ids, assume_unique=True), is_sorted=True)
+
+    def union(self, other):
+        return SortedIdSet(np.union1d(self._ids, other._ids), is_sorted=True)
+
+    def to_list(self):
+        """
+        :return: list of the IDs in this set, as Python ints
+        """
+        return self._ids.tolist()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, user_id):
+        return self.contains(user_id)
+
+    @staticmethod
+    def _to_array(ids):
+        if isinstance(ids, np.ndarray):
+            return ids.astype(SortedIdSet.DTYPE, copy=False)
+        return np.fromiter(ids, dtype=SortedIdSet.DTYPE)
@@ -0,0 +1,58 @@
+from threading import Lock
+
+from src.localization.Database import Database
+from src.localization.SortedIdSet import SortedIdSet
+from src.util import timing
+
+
+class SwissUserIndex:
+    """
+    Process-wide index of the IDs of all users known to be Swiss (is_swiss: true), in both the users and the
+    users_test_set collection. The index is built on first use, and needs to be invalidated whenever the is_swiss
+    property changes (see UserManager#set_is_swiss_property), so that it is rebuilt on next use.
+    """
+
+    _instance = None
+
+    def __init__(self):
+        self._db = Database.instance()
+        self._swiss_ids = None
+        self._lock = Lock()
+
+    @staticmethod
+    def instance():
+        if SwissUserIndex._instance is None:
+            SwissUserIndex._instance = SwissUserIndex()
+        return SwissUserIndex._instance
+
+    def get_swiss_ids(self):
+        """
+        :return: SortedIdSet with the IDs of all Swiss users
+        """
+        swiss_ids = self._swiss_ids
+        if swiss_ids is not None:
+            return swiss_ids
+        with self._lock:
+            if self._swiss_ids is None:
+                self._swiss_ids = self._build()
+            return self._swiss_ids
+
+    def count_swiss(self, user_ids):
+        """
+        :param user_ids:    iterable of user IDs
+        :return:            number of the given user IDs which belong to Swiss users
+        """
+        return self.get_swiss_ids().count_contained(user_ids)
+
+    def invalidate(self):
+        with self._lock:
+            self._swiss_ids = None
+
+    def _build(self):
+        print(timing.get_timestamp() + ": SwissUserIndex: building index")
+        ids = []
+        for users_collection in [self._db.users_mongodb, self._db.users_test_set_mongodb]:
+            ids.extend([user["id"] for user in users_collection.find({"is_swiss": True}, {"_id": 0, "id": 1})])
+        swiss_ids = SortedIdSet(ids)
+        print(timing.get_timestamp() + ": SwissUserIndex: index built, {} Swiss users".format(len(swiss_ids)))
+        return swiss_ids
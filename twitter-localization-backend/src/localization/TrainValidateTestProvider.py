@@ -1,3 +1,4 @@
+import hashlib
 import random
 import json
 import os
@@ -20,6 +21,38 @@ def get_data():
     return _train, _validate, _test
 
 
+def get_source_file_hash():
+    """
+    :return: SHA-1 hash of the content of the TVT file the sets are loaded from, None if the sets are randomized
+    """
+    use_file = context.get_config("tvt").get("use_file", None)
+    if (use_file is None) or (use_file == ""):
+        return None
+    with open(paths.convert_project_relative_path(os.path.join("configs", str(use_file) + ".json")), "rb") as infile:
+        return hashlib.sha1(infile.read()).hexdigest()
+
+
+def get_unused_labeled_users(exclude_user_ids=frozenset([]), chunk_size=1000):
+    """
+    :param exclude_user_ids:    set of IDs of users that are not returned either, e.g. users a model was trained on
+    :param chunk_size:          maximum number of users fetched with a single query
+    :return:                    list of all users in the users_test_set collection with an is_swiss field, except for
+                                the users in the train, validation and test set (e.g. users labeled after the sets were
+                                created) and the excluded users
+    """
+    train, validate, test = get_data()
+    used_user_ids = set([user["id"] for user in train + validate + test])
+    collection = Database.instance().users_test_set_mongodb
+    # only fetch the IDs of all labeled users, full documents are fetched for the unused users only
+    labeled_user_ids = [user["id"] for user in collection.find({"is_swiss": {"$exists": True}}, {"_id": 0, "id": 1})]
+    unused_user_ids = [user_id for user_id in labeled_user_ids
+                       if (user_id not in used_user_ids) and (user_id not in exclude_user_ids)]
+    users = []
+    for start in range(0, len(unused_user_ids), chunk_size):
+        users += [user for user in collection.find({"id": {"$in": unused_user_ids[start:(start + chunk_size)]}})]
+    return users
+
+
 def export_sets_to_file(filename):
     data_dict = {"train": [user["id"] for user in _train],
                  "validate": [user["id"] for user in _validate],
@@ -0,0 +1,64 @@
+from src.localization.Database import Database
+
+
+class UserContext(dict):
+    """
+    Twitter user object for the duration of one request (a classification, or building a feature matrix), which loads
+    the user's tweets from MongoDB at most once and shares them among all feature extractors that run for this user.
+    Tweets are loaded lazily, and only with the union of the tweet fields required by these feature extractors.
+    """
+
+    def __init__(self, twitter_user, tweet_fields):
+        """
+        :param twitter_user:    Twitter user object, as stored in the users or users_test_set collection
+        :param tweet_fields:    tweet fields to load, None to load entire tweet documents
+        """
+        super().__init__(twitter_user)
+        self._tweet_fields = None if tweet_fields is None else set(tweet_fields)
+        self._tweets = None
+
+    @staticmethod
+    def create_many(twitter_users, feature_extractors):
+        """
+        Creates a UserContext for each Twitter user, loading the tweet fields needed by any of the feature extractors
+        :param twitter_users:       list of Twitter user objects
+        :param feature_extractors:  list of feature extractors that will be run on the resulting contexts
+        :return:                    list of UserContext instances, in the same order as twitter_users
+        """
+        tweet_fields = UserContext.merge_tweet_fields([fe.get_required_tweet_fields() for fe in feature_extractors])
+        return [UserContext(twitter_user, tweet_fields) for twitter_user in twitter_users]
+
+    @staticmethod
+    def merge_tweet_fields(tweet_fields_lists):
+        merged_fields = set([])
+        for tweet_fields in tweet_fields_lists:
+            if tweet_fields is None:
+                return None  # at least one feature extractor needs entire tweet documents
+            merged_fields.update(tweet_fields)
+        return merged_fields
+
+    def get_tweets(self, tweet_fields=None):
+        """
+        Returns this user's tweets, loading them from MongoDB on the first call.
+        :param tweet_fields:    tweet fields needed by the caller, None for entire tweet documents; if these fields
+                                haven't been loaded by this context, the tweets are reloaded with the additional fields
+        :return:                list of tweet documents
+        """
+        if not self._covers(tweet_fields):
+            self._tweet_fields = UserContext.merge_tweet_fields([self._tweet_fields, tweet_fields])
+            self._tweets = None
+        if self._tweets is None:
+            self._tweets = UserContext.load_tweets(self["id"], self._tweet_fields)
+        return self._tweets
+
+    @staticmethod
+    def load_tweets(user_id, tweet_fields):
+        projection = None if tweet_fields is None else {field: 1 for field in tweet_fields}
+        return [tweet for tweet in Database.instance().tweets_mongodb.find({"author_id": user_id}, projection)]
+
+    def _covers(self, tweet_fields):
+        if self._tweet_fields is None:
+            return True
+        if tweet_fields is None:
+            return False
+        return set(tweet_fields).issubset(self._tweet_fields)
@@ -0,0 +1,135 @@
+import numpy as np
+
+
+class RandomProjectionKNN:
+    """
+    Approximate k-nearest-neighbors classifier with the interface of an SKLearn classifier (fit, predict_proba, predict,
+    score), to be used with SKLearn. The training samples are indexed in a forest of num_trees random projection trees:
+    each node of a tree splits its samples at the median of their projections onto a random direction, until the
+    leaves hold at most leaf_size samples. A query descends each tree to one leaf and is only compared with the samples
+    in these leaves, so prediction time grows with num_trees * leaf_size and with the depth of the trees (logarithmic
+    in the size of the training set) rather than with the size of the training set. More trees find more of the true
+    nearest neighbors.
+    """
+
+    # number of queries compared with their candidates at once, bounds the memory needed for predictions
+    _QUERY_CHUNK_SIZE = 1000
+
+    def __init__(self, n_neighbors=5, num_trees=8, leaf_size=32, seed=1):
+        """
+        :param n_neighbors: number of neighbors voting on the class of a sample
+        :param num_trees:   number of random projection trees
+        :param leaf_size:   maximum number of samples in a leaf, raised to 2 * n_neighbors if smaller
+        :param seed:        seed of the random projections
+        """
+        self.n_neighbors = n_neighbors
+        self.num_trees = num_trees
+        self.leaf_size = leaf_size
+        self.seed = seed
+        self.classes_ = None
+        self._train_x = None
+        self._train_y = None
+        self._depth = 0
+        self._trees = []
+
+    def get_params(self, deep=True):
+        return {"n_neighbors": self.n_neighbors, "num_trees": self.num_trees, "leaf_size": self.leaf_size,
+                "seed": self.seed}
+
+    def set_params(self, **params):
+        for key, value in params.items():
+            setattr(self, key, value)
+        return self
+
+    def fit(self, x, y):
+        self._train_x = np.asarray(x, dtype=float)
+        self.classes_, self._train_y = np.unique(np.asarray(y), return_inverse=True)
+        leaf_size = max(self.leaf_size, 2 * self.n_neighbors)
+        self._depth = int(max(0, np.ceil(np.log2(len(self._train_x) / float(leaf_size)))))
+        random_state = np.random.RandomState(self.seed)
+        self._trees = [self._build_tree(random_state) for _ in range(0, self.num_trees)]
+        return self
+
+    def _build_tree(self, random_state):
+        """
+        Builds a tree level by level: the samples of each node are kept in a contiguous segment of the permutation,
+        each level sorts all segments by their projections and splits them in the middle. Nodes are numbered like in
+        a binary heap, the children of node h are 2h + 1 and 2h + 2.
+        :return:    (split directions, split thresholds, permutation of the training samples, leaf boundaries in the
+                    permutation)
+        """
+        num_samples, num_features = self._train_x.shape
+        directions = random_state.normal(size=((1 << self._depth) - 1, num_features))
+        thresholds = np.zeros((1 << self._depth) - 1)
+        permutation = np.arange(num_samples)
+        permuted_x = self._train_x
+        bounds = np.array([0, num_samples])
+        for level in range(0, self._depth):
+            first_node = (1 << level) - 1
+            node_of_position = np.repeat(np.arange(first_node, 2 * first_node + 1), np.diff(bounds))
+            projections = np.einsum("ij,ij->i", permuted_x, directions[node_of_position])
+            # sort by node, then by projection, with a single key (much faster than np.lexsort)
+            scaled_projections = (projections - projections.min()) / (np.ptp(projections) + 1e-12)
+            order = np.argsort(node_of_position * 2.0 + scaled_projections)
+            permutation = permutation[order]
+            permuted_x = permuted_x[order]
+            projections = projections[order]
+            middles = bounds[:-1] + np.diff(bounds) // 2
+            splittable = (middles > bounds[:-1]) & (middles < bounds[1:])
+            thresholds[first_node:(2 * first_node + 1)][splittable] = \
+                (projections[middles[splittable] - 1] + projections[middles[splittable]]) / 2
+            bounds = np.insert(bounds, np.arange(1, len(bounds)), middles)
+        return directions, thresholds, permutation, bounds
+
+    def kneighbors(self, x):
+        """
+        :param x:   2-dimensional array with samples as row vectors
+        :return:    numpy array with the indices of the (approximately) nearest training samples, one row per sample
+        """
+        x = np.asarray(x, dtype=float)
+        return np.vstack([self._kneighbors_chunk(x[start:(start + RandomProjectionKNN._QUERY_CHUNK_SIZE)])
+                          for start in range(0, len(x), RandomProjectionKNN._QUERY_CHUNK_SIZE)] +
+                         [np.empty((0, min(self.n_neighbors, len(self._train_x))), dtype=np.int64)])
+
+    def _kneighbors_chunk(self, x):
+        num_samples = len(self._train_x)
+        candidates = np.hstack([self._get_leaf_members(tree, x) for tree in self._trees])
+        # duplicates (samples found in several trees) and padding are marked with num_samples, sorted to the end
+        candidates.sort(axis=1)
+        candidates[:, 1:][candidates[:, 1:] == candidates[:, :-1]] = num_samples
+        candidates.sort(axis=1)
+        valid = candidates < num_samples
+        distances = ((self._train_x[np.minimum(candidates, num_samples - 1)] - x[:, np.newaxis, :]) ** 2).sum(axis=2)
+        distances[~valid] = np.inf
+        n_neighbors = min(self.n_neighbors, num_samples)
+        nearest = np.argsort(distances, axis=1, kind="stable")[:, 0:n_neighbors]
+        return np.take_along_axis(candidates, nearest, axis=1)
+
+    def _get_leaf_members(self, tree, x):
+        """
+        :return:    numpy array with the training sample indices in the leaf reached by each query, one row per query,
+                    padded with len(training set)
+        """
+        directions, thresholds, permutation, bounds = tree
+        nodes = np.zeros(len(x), dtype=np.int64)
+        for _ in range(0, self._depth):
+            projections = np.einsum("ij,ij->i", x, directions[nodes])
+            nodes = 2 * nodes + 1 + (projections > thresholds[nodes])
+        leaves = nodes - ((1 << self._depth) - 1)
+        starts = bounds[leaves]
+        sizes = bounds[leaves + 1] - starts
+        offsets = np.arange(np.diff(bounds).max())
+        positions = np.minimum(starts[:, np.newaxis] + offsets, len(permutation) - 1)
+        return np.where(offsets < sizes[:, np.newaxis], permutation[positions], len(permutation))
+
+    def predict_proba(self, x):
+        neighbor_classes = self._train_y[self.kneighbors(x)]
+        votes = np.stack([np.count_nonzero(neighbor_classes == class_index, axis=1)
+                          for class_index in range(0, len(self.classes_))], axis=1)
+        return votes / float(neighbor_classes.shape[1])
+
+    def predict(self, x):
+        return self.classes_[self.predict_proba(x).argmax(axis=1)]
+
+    def score(self, x, y):
+        return float(np.mean(self.predict(x) == np.asarray(y)))
@@ -1,5 +1,8 @@
 from src.localization.Classifier import Classifier
+from src.localization.classifiers.RandomProjectionKNN import RandomProjectionKNN
+from src.util import context
 from sklearn.neighbors import KNeighborsClassifier
+import numpy as np
 
 
 class SKLearn(Classifier):
@@ -7,12 +10,49 @@ class SKLearn(Classifier):
     add doc
     """
 
-    def __init__(self, sklearn_clf=None):
+    # neighbor search algorithms of KNeighborsClassifier, plus the approximate RandomProjectionKNN
+    NEIGHBOR_INDEXES = ["auto", "brute", "kd_tree", "ball_tree", "random_projection"]
+
+    def __init__(self, sklearn_clf=None, neighbor_index=None):
+        """
+        :param sklearn_clf:     SKLearn classifier instance, defaults to KNeighborsClassifier(3)
+        :param neighbor_index:  neighbor index used if sklearn_clf is a KNeighborsClassifier: a dictionary with key
+                                "algorithm" (one of NEIGHBOR_INDEXES) and the algorithm's parameters, i.e. "leaf_size"
+                                for kd_tree, ball_tree and random_projection, and "num_trees" for random_projection
+                                (see RandomProjectionKNN). Defaults to the "knn_index" config item, which is only
+                                applied if sklearn_clf's algorithm and leaf_size are left at their defaults.
+        """
         super().__init__("SKLearn")
         if sklearn_clf is None:
-            self._clf = KNeighborsClassifier(3)
-        else:
-            self._clf = sklearn_clf
+            sklearn_clf = KNeighborsClassifier(3)
+        if isinstance(sklearn_clf, KNeighborsClassifier):
+            if neighbor_index is not None:
+                sklearn_clf = SKLearn._apply_neighbor_index(sklearn_clf, neighbor_index)
+            elif SKLearn._has_default_neighbor_index(sklearn_clf):
+                sklearn_clf = SKLearn._apply_neighbor_index(sklearn_clf, context.get_config("knn_index"))
+        self._clf = sklearn_clf
+
+    @staticmethod
+    def _has_default_neighbor_index(knn_clf):
+        default_params = KNeighborsClassifier().get_params()
+        return all(knn_clf.get_params()[name] == default_params[name] for name in ["algorithm", "leaf_size"])
+
+    @staticmethod
+    def _apply_neighbor_index(knn_clf, neighbor_index):
+        algorithm = neighbor_index.get("algorithm", "auto")
+        if algorithm not in SKLearn.NEIGHBOR_INDEXES:
+            raise ValueError("unknown neighbor index '{}', expected one of {}"
+                             .format(algorithm, SKLearn.NEIGHBOR_INDEXES))
+        if algorithm == "random_projection":
+            # RandomProjectionKNN only implements uniform votes of the nearest neighbors by euclidean distance
+            is_euclidean = (knn_clf.metric == "euclidean") or ((knn_clf.metric == "minkowski") and (knn_clf.p == 2))
+            if (knn_clf.weights != "uniform") or (not is_euclidean) or (knn_clf.metric_params is not None):
+                raise ValueError("the random_projection neighbor index doesn't support weights={}, metric={}, p={}"
+                                 .format(knn_clf.weights, knn_clf.metric, knn_clf.p))
+            return RandomProjectionKNN(n_neighbors=knn_clf.n_neighbors,
+                                       num_trees=neighbor_index.get("num_trees", 8),
+                                       leaf_size=neighbor_index.get("leaf_size", 32))
+        return knn_clf.set_params(algorithm=algorithm, leaf_size=neighbor_index.get("leaf_size", knn_clf.leaf_size))
 
     def _train(self, training_set, validation_set):
         train_x = training_set[:, :-1]
@@ -22,6 +62,13 @@ class SKLearn(Classifier):
         self._clf.fit(train_x, train_y)
         return self._clf.score(val_x, val_y)
 
+    def _update(self, new_samples, training_set, validation_set):
+        if not hasattr(self._clf, "partial_fit"):
+            # e.g. KNeighborsClassifier, which is cheap to refit from the stored training set
+            return self._train(training_set, validation_set)
+        self._clf.partial_fit(new_samples[:, :-1], new_samples[:, -1:].flatten(), classes=self._clf.classes_)
+        return self._clf.score(validation_set[:, :-1], validation_set[:, -1:].flatten())
+
     def _classify(self, sample):
         n_sample = sample.reshape(1, -1)
         prediction = self._clf.predict_proba(n_sample)
@@ -29,6 +76,12 @@ class SKLearn(Classifier):
         confidence = prediction[0][predicted_class]
         return predicted_class, confidence
 
+    def _classify_batch(self, samples):
+        prediction = self._clf.predict_proba(samples)
+        predicted_classes = prediction.argmax(axis=1)
+        confidences = prediction[np.arange(len(predicted_classes)), predicted_classes]
+        return predicted_classes, confidences
+
     def set_classifier(self, sklearn_classifier_instance):
         """
         Set the SKLearn classifier to be used. After this function is called, the classifier needs to be retrained
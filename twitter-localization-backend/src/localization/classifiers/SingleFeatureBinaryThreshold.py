@@ -19,15 +19,11 @@ class SingleFeatureBinaryThreshold(Classifier):
 
     def _train(self, training_set, validation_set):
         num_training_samples = training_set.shape[0]
-        positives = []
-        negatives = []
-        for i in range(0, num_training_samples):
-            if training_set[i, -1] == 1:
-                positives.append(training_set[i, 0])
-            else:
-                negatives.append(training_set[i, 0])
-        self._positive_avg = np.array(positives).sum() / len(positives)
-        self._negative_avg = np.array(negatives).sum() / len(negatives)
+        is_positive = training_set[:, -1] == 1
+        positives = training_set[is_positive, 0]
+        negatives = training_set[~is_positive, 0]
+        self._positive_avg = positives.sum() / len(positives)
+        self._negative_avg = negatives.sum() / len(negatives)
         self._delta_positive_negative = abs(self._positive_avg - self._negative_avg)
         self._prior_positive = len(positives) / num_training_samples
         self._prior_negative = len(negatives) / num_training_samples
@@ -36,27 +32,29 @@ class SingleFeatureBinaryThreshold(Classifier):
         return self._calculate_score(validation_set)
 
     def _classify(self, sample):
-        delta_positive = abs(sample[0] - self._positive_avg)
-        delta_negative = abs(sample[0] - self._negative_avg)
-        predicted_class = self._predict_class(delta_positive, delta_negative)
-        confidence = self._calculate_confidence(sample, delta_positive, delta_negative)
-        return predicted_class, confidence
+        predicted_classes, confidences = self._classify_batch(np.array([sample]))
+        return int(predicted_classes[0]), float(confidences[0])
 
-    def _predict_class(self, delta_positive, delta_negative):
-        if delta_positive < delta_negative:
-            return 1
-        elif delta_negative < delta_positive:
-            return 0
-        else:
-            return self._break_tie()
+    def _classify_batch(self, samples):
+        """
+        Classifies many samples at once (see Classifier#classify_batch), only the first column of samples is used
+        """
+        delta_positive = np.abs(samples[:, 0] - self._positive_avg)
+        delta_negative = np.abs(samples[:, 0] - self._negative_avg)
+        predicted_classes = self._predict_classes(delta_positive, delta_negative)
+        confidences = self._calculate_confidences(delta_positive, delta_negative)
+        return predicted_classes, confidences
+
+    def _predict_classes(self, delta_positive, delta_negative):
+        tie_class = self._break_tie()
+        return np.where(delta_positive < delta_negative, 1, np.where(delta_negative < delta_positive, 0, tie_class))
 
-    def _calculate_confidence(self, sample, delta_positive, delta_negative):
+    def _calculate_confidences(self, delta_positive, delta_negative):
         if self._delta_positive_negative == 0:
-            return 0.5  # guard against cases where positive and negative average are equal
-        p_delta_pos = delta_positive / self._delta_positive_negative
-        p_delta_neg = delta_negative / self._delta_positive_negative
-        winning_p_delta = max(p_delta_pos, p_delta_neg)
-        return min(winning_p_delta, 1)
+            # guard against cases where positive and negative average are equal
+            return np.full(len(delta_positive), 0.5)
+        winning_p_delta = np.maximum(delta_positive, delta_negative) / self._delta_positive_negative
+        return np.minimum(winning_p_delta, 1)
 
     def _break_tie(self):
         if self._prior_positive >= self._prior_negative:
@@ -65,12 +63,5 @@ class SingleFeatureBinaryThreshold(Classifier):
             return 0
 
     def _calculate_score(self, validation_set):
-        total_samples = validation_set.shape[0]
-        num_correct = 0
-        for i in range(0, total_samples):
-            sample = validation_set[i]
-            true_class = sample[-1]
-            predicted_class, confidence = self._classify(sample[0:1])
-            if true_class == predicted_class:
-                num_correct += 1
-        return num_correct / total_samples
+        predicted_classes, confidences = self._classify_batch(validation_set[:, 0:1])
+        return float(np.count_nonzero(predicted_classes == validation_set[:, -1])) / validation_set.shape[0]
@@ -0,0 +1,69 @@
+import hashlib
+import json
+
+from src.localization.HashtagHistogramStore import HashtagHistogramStore
+from src.localization.MinHashLshIndex import MinHashLshIndex
+from src.localization.featureextractors.TopHashtags import TopHashtags
+from src.util import timing
+
+
+class HashtagProfileMatch(TopHashtags):
+    """
+    Matches a user's top hashtags against many reference hashtag profiles (e.g. one per canton, language or influencer
+    category, see ReferenceGroups), and returns the best matching profiles. A reference profile is the list of top
+    hashtags of a group of users; profiles are indexed as MinHash signatures (see MinHashLshIndex), so that users are
+    only compared with the profiles that are likely to be similar, and similarities are estimated Jaccard similarities.
+    """
+
+    def __init__(self, reference_groups, vector_length=100, top_k=3, scores_only=True, num_perm=128, num_bands=64,
+                 allow_cache_updates=False):
+        """
+        :param reference_groups:    dictionary {profile name: list of user IDs}, one reference profile is built for
+                                    each group of users
+        :param vector_length:       number of top hashtags per user and per reference profile
+        :param top_k:               number of best matching reference profiles
+        :param scores_only:         if True, the feature is the list of the top_k similarities, padded with zeros; else,
+                                    the list of [profile name, similarity] pairs of the best matching profiles
+        :param num_perm:            length of the MinHash signatures
+        :param num_bands:           number of LSH bands (see MinHashLshIndex)
+        """
+        super().__init__(vector_length, allow_cache_updates=allow_cache_updates,
+                         fe_name=("hashtag_profile_match_scores" if scores_only else "hashtag_profile_match"))
+        self._top_k = top_k
+        self._scores_only = scores_only
+        self._num_perm = num_perm
+        self._num_bands = num_bands
+        self._reference_groups_hash = HashtagProfileMatch._hash_reference_groups(reference_groups)
+        self._index = MinHashLshIndex(num_perm, num_bands)
+        self._build_index(reference_groups)
+
+    def _get_cache_parameters(self):
+        return {"vector_length": self._vector_length, "top_k": self._top_k, "num_perm": self._num_perm,
+                "num_bands": self._num_bands, "reference_groups": self._reference_groups_hash}
+
+    @staticmethod
+    def _hash_reference_groups(reference_groups):
+        serialized_groups = json.dumps({name: sorted(user_ids) for name, user_ids in reference_groups.items()},
+                                       sort_keys=True)
+        return hashlib.sha1(serialized_groups.encode("utf-8")).hexdigest()
+
+    def _build_index(self, reference_groups):
+        print(timing.get_timestamp() + ": HashtagProfileMatch: building {} reference profiles"
+              .format(len(reference_groups)))
+        histogram_store = HashtagHistogramStore.instance()
+        histogram_store.materialize(list(set([user_id for user_ids in reference_groups.values()
+                                              for user_id in user_ids])))
+        for name, user_ids in reference_groups.items():
+            profile = [hashtag for hashtag, count in histogram_store.get_top_hashtags(user_ids, self._vector_length)]
+            if len(profile) > 0:
+                self._index.add(name, profile)
+
+    def _extract_for_many(self, twitter_users):
+        return [self._match(self._rank_hashtags(hashtag_counts))
+                for hashtag_counts in self._get_hashtag_counts(twitter_users)]
+
+    def _match(self, user_top_hashtags):
+        matches = self._index.query(user_top_hashtags, self._top_k)
+        if self._scores_only:
+            return [similarity for name, similarity in matches] + [0] * (self._top_k - len(matches))
+        return [[name, similarity] for name, similarity in matches]
@@ -1,16 +1,19 @@
-import operator
+import hashlib
 
 from src.localization import LocalizationConstants
 from src.localization.Database import Database
+from src.localization.HashtagHistogramStore import HashtagHistogramStore
 from src.localization.featureextractors.TopHashtags import TopHashtags
 from src.util import timing
 
 
 class HashtagSimilarity(TopHashtags):
 
-    def __init__(self, train_set, vector_length, use_cached_vector, allow_cache_updates=False):
-        super().__init__(vector_length, allow_cache_updates=allow_cache_updates, fe_name="hashtag_similarity")
+    def __init__(self, train_set, vector_length, use_cached_vector, allow_cache_updates=False, use_histograms=True):
+        super().__init__(vector_length, allow_cache_updates=allow_cache_updates, fe_name="hashtag_similarity",
+                         use_histograms=use_histograms)
         self._average_swiss_vector = None
+        self._train_set_hash = HashtagSimilarity._hash_train_set(train_set)
         self._init_reference_vector(train_set, use_cached_vector, allow_cache_updates)
         self._average_swiss_vector = set(self._average_swiss_vector)
 
@@ -22,10 +25,17 @@ class HashtagSimilarity(TopHashtags):
             if allow_cache_updates:
                 self._cache_average_swiss_vector()
 
-    def _extract_for(self, twitter_user):
-        user_tweets = TopHashtags._collect_tweets_for_user(twitter_user["id"])
-        user_top_hashtags = set(self._calculate_top_hashtags(user_tweets, include_counts=False))
-        return self._calculate_similarity(user_top_hashtags)
+    def _get_cache_parameters(self):
+        return {"vector_length": self._vector_length, "reference_vector": sorted(self._average_swiss_vector)}
+
+    @staticmethod
+    def _hash_train_set(train_set):
+        user_ids = sorted([str(user["id"]) for user in train_set])
+        return hashlib.sha1(",".join(user_ids).encode("utf-8")).hexdigest()
+
+    def _extract_for_many(self, twitter_users):
+        return [self._calculate_similarity(set(self._rank_hashtags(hashtag_counts)))
+                for hashtag_counts in self._get_hashtag_counts(twitter_users)]
 
     def _calculate_similarity(self, user_top_hashtags):
         common_hashtags = user_top_hashtags.intersection(self._average_swiss_vector)
@@ -35,14 +45,16 @@ class HashtagSimilarity(TopHashtags):
         obj = {
             LocalizationConstants.INTERMEDIATE_RESULT: "top_swiss_hashtags",
             "vector": self._average_swiss_vector,
-            "vector_length": self._vector_length
+            "vector_length": self._vector_length,
+            "train_set_hash": self._train_set_hash
         }
         Database.instance().feature_cache.save(obj)
 
     def _fetch_cached_average_swiss_vector(self):
         obj = Database.instance().feature_cache.find_one({
             LocalizationConstants.INTERMEDIATE_RESULT: "top_swiss_hashtags",
-            "vector_length": self._vector_length
+            "vector_length": self._vector_length,
+            "train_set_hash": self._train_set_hash
         })
         if obj is None:
             return None
@@ -51,7 +63,8 @@ class HashtagSimilarity(TopHashtags):
     def _calculate_average_swiss_hashtag_vector(self, train_set):
         print(timing.get_timestamp() + ": HashtagSimilarity: extracting average swiss hashtag vector")
         swiss_ids = [user["id"] for user in train_set]
-        swiss_tweets = [t for t in Database.instance().tweets_mongodb.find({"author_id": {"$in": swiss_ids}})]
-        return self._calculate_top_hashtags(swiss_tweets, include_counts=False)
-
-
+        histogram_store = HashtagHistogramStore.instance()
+        if self._use_histograms:
+            histogram_store.materialize(swiss_ids)
+            return [hashtag for hashtag, count in histogram_store.get_top_hashtags(swiss_ids, self._vector_length)]
+        return self._rank_hashtags(histogram_store.count_hashtags_of_authors(swiss_ids))
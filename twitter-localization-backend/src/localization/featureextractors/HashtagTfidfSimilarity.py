@@ -0,0 +1,90 @@
+import hashlib
+
+import numpy as np
+import scipy.sparse
+from sklearn.feature_extraction import DictVectorizer
+from sklearn.feature_extraction.text import TfidfTransformer
+from sklearn.preprocessing import normalize
+
+from src.localization.FeatureExtractor import FeatureExtractor
+from src.localization.HashtagHistogramStore import HashtagHistogramStore
+from src.util import timing
+
+
+class HashtagTfidfSimilarity(FeatureExtractor):
+    """
+    Cosine similarity of a user's TF-IDF weighted hashtag vector to the centroids of the Swiss and the non-Swiss users
+    of the training set. Hashtag counts are taken from the users' hashtag histograms (see HashtagHistogramStore); the
+    hashtag vocabulary and the IDF weights are fitted on the training set. The feature is [similarity to the Swiss
+    centroid, similarity to the non-Swiss centroid].
+    """
+
+    _REQUIRED_TWEET_FIELDS = []
+
+    def __init__(self, train_set, allow_cache_updates=False, sublinear_tf=True):
+        """
+        :param train_set:       list of Twitter users with is_swiss field, used to fit the vocabulary, the IDF weights
+                                and the centroids
+        :param sublinear_tf:    if True, hashtag counts are scaled to 1 + log(count) (see TfidfTransformer)
+        """
+        super().__init__("hashtag_tfidf_similarity", allow_cache_updates)
+        self._sublinear_tf = sublinear_tf
+        self._train_set_hash = HashtagTfidfSimilarity._hash_train_set(train_set)
+        self._vectorizer = DictVectorizer(sparse=True)
+        self._tfidf = TfidfTransformer(sublinear_tf=sublinear_tf)
+        self._centroids = None
+        self._fit(train_set)
+
+    def _get_cache_parameters(self):
+        return {"sublinear_tf": self._sublinear_tf, "train_set_hash": self._train_set_hash}
+
+    @staticmethod
+    def _hash_train_set(train_set):
+        user_ids = sorted([str(user["id"]) for user in train_set])
+        return hashlib.sha1(",".join(user_ids).encode("utf-8")).hexdigest()
+
+    def _fit(self, train_set):
+        print(timing.get_timestamp() + ": HashtagTfidfSimilarity: fitting TF-IDF model")
+        hashtag_counts = HashtagTfidfSimilarity._get_hashtag_counts([user["id"] for user in train_set])
+        count_matrix = self._vectorizer.fit_transform(hashtag_counts)
+        if count_matrix.shape[1] == 0:
+            # no user of the training set used any hashtag, TfidfTransformer can't be fitted on an empty vocabulary
+            print(timing.get_timestamp() + ": HashtagTfidfSimilarity: empty hashtag vocabulary, similarities are 0")
+            self._centroids = None
+            return
+        train_matrix = self._tfidf.fit_transform(count_matrix)
+        is_swiss = np.array([bool(user["is_swiss"]) for user in train_set])
+        centroids = [HashtagTfidfSimilarity._centroid(train_matrix[np.flatnonzero(is_swiss)]),
+                     HashtagTfidfSimilarity._centroid(train_matrix[np.flatnonzero(~is_swiss)])]
+        self._centroids = normalize(scipy.sparse.vstack(centroids).tocsr())
+
+    @staticmethod
+    def _centroid(rows):
+        if rows.shape[0] == 0:
+            return scipy.sparse.csr_matrix((1, rows.shape[1]))
+        return scipy.sparse.csr_matrix(rows.mean(axis=0))
+
+    def calculate_similarities(self, hashtag_counts):
+        """
+        Calculates the feature for many users at once, as a single sparse matrix product
+        :param hashtag_counts:  list with a dictionary {normalized hashtag: count} for each user
+        :return:                numpy array with one row [swiss similarity, non-swiss similarity] per user
+        """
+        if self._centroids is None:
+            return np.zeros((len(hashtag_counts), 2))
+        user_matrix = self._tfidf.transform(self._vectorizer.transform(hashtag_counts))
+        return np.asarray((user_matrix @ self._centroids.T).todense())
+
+    def _extract_for(self, twitter_user):
+        return self._extract_for_many([twitter_user])[0]
+
+    def _extract_for_many(self, twitter_users):
+        hashtag_counts = HashtagTfidfSimilarity._get_hashtag_counts([tu["id"] for tu in twitter_users])
+        return self.calculate_similarities(hashtag_counts).tolist()
+
+    @staticmethod
+    def _get_hashtag_counts(user_ids):
+        histogram_store = HashtagHistogramStore.instance()
+        histogram_store.materialize(user_ids)
+        histograms = histogram_store.get_histograms(user_ids)
+        return [histograms.get(user_id, {}) for user_id in user_ids]
@@ -1,21 +1,43 @@
+import numpy as np
+
 from src.localization.FeatureExtractor import FeatureExtractor
+from src.localization.FollowerSetStore import FollowerSetStore
+from src.localization.InfluencerFollowerIndex import InfluencerFollowerIndex
 
 
 class SwissInfluencersFollowedRatio(FeatureExtractor):
 
-    def __init__(self, allow_cache_updates=False):
+    def __init__(self, allow_cache_updates=False, use_follower_sets=False):
+        """
+        :param use_follower_sets:   if True, influencers followed are counted with membership tests against the
+                                    influencers' follower sets (see FollowerSetStore), instead of being looked up in
+                                    the InfluencerFollowerIndex collection
+        """
         super().__init__("swiss_influencers_followed_ratio", allow_cache_updates)
+        self._use_follower_sets = use_follower_sets
 
     def _extract_for(self, twitter_user):
+        return self._extract_for_many([twitter_user])[0]
+
+    def _extract_for_many(self, twitter_users):
+        user_ids = [tu["id"] for tu in twitter_users]
+        if self._use_follower_sets:
+            counts = SwissInfluencersFollowedRatio._count_with_follower_sets(user_ids)
+        else:
+            counts_by_id = InfluencerFollowerIndex.instance().get_influencer_counts(user_ids)
+            counts = [counts_by_id[user_id] for user_id in user_ids]
+        return [SwissInfluencersFollowedRatio._to_ratio(tu, count) for tu, count in zip(twitter_users, counts)]
+
+    @staticmethod
+    def _count_with_follower_sets(user_ids):
+        counts = np.zeros(len(user_ids), dtype=np.int64)
+        for follower_set in FollowerSetStore.instance().get_all():
+            counts += follower_set.contains_many(user_ids)
+        return counts.tolist()
+
+    @staticmethod
+    def _to_ratio(twitter_user, num_ch_influencers_followed):
         num_total_friends = twitter_user["friends_count"]
         if num_total_friends == 0:
             return 0
-        num_ch_influencers_followed = self._count_swiss_influencers_followed(twitter_user)
         return num_ch_influencers_followed/num_total_friends
-
-    def _count_swiss_influencers_followed(self, twitter_user):
-        result = self._db.users_mongodb.find({
-            "type": "influencer",
-            "followerIds": {"$elemMatch": {"$eq": twitter_user["id"]}}
-        })
-        return result.count()
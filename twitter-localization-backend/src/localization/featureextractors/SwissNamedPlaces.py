@@ -1,34 +1,86 @@
 import json
 
-import spacy
 import unidecode
+from tqdm import tqdm
 
+from src.localization import LanguageModels
 from src.localization import LocalizationConstants
 from src.localization.Database import Database
 from src.localization.FeatureExtractor import FeatureExtractor
+from src.localization.NerResultCache import NerResultCache
+from src.localization.PlaceGazetteer import PlaceGazetteer
 from src.util import paths
 
 
 class SwissNamedPlaces(FeatureExtractor):
 
-    def __init__(self, allow_cache_updates=False, count_only=True):
+    MATCHING_ENGINE_NER = "ner"
+    MATCHING_ENGINE_GAZETTEER = "gazetteer"
+
+    _REQUIRED_TWEET_FIELDS = ["text", "lang"]
+
+    def __init__(self, allow_cache_updates=False, count_only=True, ner_batch_size=256, ner_n_process=1,
+                 preload_languages=None, matching_engine=MATCHING_ENGINE_NER, use_ner_cache=True):
+        """
+        :param count_only:          if True, the feature is the number of distinct Swiss places named in the user's
+                                    tweets, else the set of these places
+        :param ner_batch_size:      number of tweets spaCy processes per batch (see spacy.Language#pipe)
+        :param ner_n_process:       number of processes spaCy uses for NER (see spacy.Language#pipe)
+        :param preload_languages:   languages whose spaCy models are loaded right away; all other models are loaded
+                                    the first time a tweet in that language is processed (see LanguageModels)
+        :param matching_engine:     how places are detected in tweets: "ner" runs spaCy NER on tweets in supported
+                                    languages and matches the recognized locations against Swiss place names,
+                                    "gazetteer" scans tweets in any language for Swiss place names directly (see
+                                    PlaceGazetteer), which is much faster but less precise
+        :param use_ner_cache:       if True, NER results are stored in and read from the NER result cache, keyed by
+                                    the normalized tweet text (see NerResultCache)
+        """
         super().__init__(("swiss_named_places_count" if count_only else "swiss_named_places"), allow_cache_updates)
         self._get_count = count_only
-        self._nlp = {
-            "de": spacy.load('de_core_news_sm'),
-            "fr": spacy.load('fr_core_news_sm'),
-            "it": spacy.load('it_core_news_sm'),
-            "en": spacy.load('en_core_web_sm')
-        }
+        self._ner_batch_size = ner_batch_size
+        self._ner_n_process = ner_n_process
+        self._matching_engine = matching_engine
+        self._use_ner_cache = use_ner_cache
         with open(paths.convert_project_relative_path("data/ner_place_stopwords.json"), "r", encoding="utf-8") as fp:
             self._stopwords = json.load(fp)["stopwords"]
         self._reference_set = self._build_geo_reference_set()
+        self._gazetteer = None
+        if matching_engine == SwissNamedPlaces.MATCHING_ENGINE_GAZETTEER:
+            self._gazetteer = PlaceGazetteer(self._reference_set.difference(self._stopwords))
+        elif matching_engine == SwissNamedPlaces.MATCHING_ENGINE_NER:
+            LanguageModels.preload(preload_languages or [])
+        else:
+            raise ValueError("Unknown matching engine '{}'".format(matching_engine))
+
+    def extract_places_per_tweet(self, tweets):
+        """
+        Detects the Swiss places named in each of the given tweets, using this extractor's matching engine
+        :param tweets:  list of tweet documents with text and lang fields
+        :return:        list with the set of Swiss places named in each tweet, in the same order as tweets
+        """
+        if self._matching_engine == SwissNamedPlaces.MATCHING_ENGINE_GAZETTEER:
+            return [self._gazetteer.find_places(tweet["text"]) for tweet in tweets]
+        return [places.intersection(self._reference_set) for places in self._perform_ner(tweets)]
+
+    def _get_cache_parameters(self):
+        return {"matching_engine": self._matching_engine}
 
     def _extract_for(self, twitter_user):
-        ne_set = self._perform_ner(twitter_user["id"])
+        return self._extract_for_many([twitter_user])[0]
+
+    def _extract_for_many(self, twitter_users):
+        ne_sets = [set([]) for _ in twitter_users]
+        user_indices = []
+        tweets = []
+        for user_index, twitter_user in enumerate(twitter_users):
+            user_tweets = self._get_tweets(twitter_user)
+            user_indices.extend([user_index] * len(user_tweets))
+            tweets.extend(user_tweets)
+        for user_index, places in zip(user_indices, self.extract_places_per_tweet(tweets)):
+            ne_sets[user_index].update(places)
         if self._get_count:
-            return len(ne_set)
-        return ne_set
+            return [len(ne_set) for ne_set in ne_sets]
+        return ne_sets
 
     @staticmethod
     def _build_geo_reference_set():
@@ -42,26 +94,65 @@ class SwissNamedPlaces(FeatureExtractor):
             geo_names.add(name)
         return geo_names
 
-    def _perform_ner(self, user_id):
-        tweets_cursor = Database.instance().tweets_mongodb.find({"author_id": user_id})
-        tokens = self._tokenize_user_tweets(tweets_cursor)
-        return tokens.intersection(self._reference_set)
-
-    def _tokenize_user_tweets(self, tweets):
-        tokens = set([])
-        for tweet in tweets:
-            tokens = tokens.union(self._extract_places(tweet))
-        return tokens
-
-    def _extract_places(self, tweet):
-        proper_nouns = set([])
-        nlp = self._nlp.get(tweet["lang"], None)
-        if nlp is None:
-            return proper_nouns
-        tokens = nlp(tweet["text"].replace("#", ""))
-        for token in tokens:
+    def _perform_ner(self, tweets):
+        """
+        Runs NER over the given tweets, in one batch per language. Tweets with identical normalized texts (e.g.
+        retweets) are processed only once, and texts whose results are in the NER result cache are not processed at all
+        :return: list with the set of locations recognized in each tweet, in the same order as tweets
+        """
+        tweets_by_lang = {}
+        for tweet_index, tweet in enumerate(tweets):
+            normalized_text = NerResultCache.normalize_text(tweet["text"])
+            tweets_by_lang.setdefault(tweet["lang"], []).append((tweet_index, normalized_text))
+        places = [set([]) for _ in tweets]
+        for lang, lang_tweets in tweets_by_lang.items():
+            if not LanguageModels.is_supported(lang):
+                continue
+            texts_by_hash = {}
+            for _, text in lang_tweets:
+                texts_by_hash.setdefault(NerResultCache.hash_text(text), text)
+            locations_by_hash = self._recognize_locations(lang, texts_by_hash, len(tweets))
+            for tweet_index, text in lang_tweets:
+                places[tweet_index] = self._filter_stopwords(locations_by_hash[NerResultCache.hash_text(text)])
+        return places
+
+    def _recognize_locations(self, lang, texts_by_hash, num_tweets):
+        """
+        Get the locations recognized in each of the given distinct texts, running NER only on texts which are not in
+        the NER result cache
+        :param lang:            language of the texts
+        :param texts_by_hash:   dictionary mapping text hashes to normalized texts
+        :param num_tweets:      total number of tweets being processed, used to decide whether to show progress
+        :return:                dictionary mapping each text hash to the list of locations recognized in the text
+        """
+        model_name = LanguageModels.get_model_name(lang)
+        locations_by_hash = {}
+        if self._use_ner_cache:
+            locations_by_hash = NerResultCache.instance().fetch_many(model_name, lang, texts_by_hash.keys())
+        missing_hashes = [text_hash for text_hash in texts_by_hash if text_hash not in locations_by_hash]
+        if len(missing_hashes) == 0:
+            return locations_by_hash
+        nlp = LanguageModels.get_model(lang)
+        texts = [texts_by_hash[text_hash] for text_hash in missing_hashes]
+        docs = nlp.pipe(texts, batch_size=self._ner_batch_size, n_process=self._ner_n_process,
+                        disable=[pipe_name for pipe_name in nlp.pipe_names if pipe_name != "ner"])
+        show_progress = FeatureExtractor._show_progress and num_tweets > self._ner_batch_size
+        docs = tqdm(docs, total=len(texts), disable=not show_progress)
+        new_locations_by_hash = {}
+        for text_hash, doc in zip(missing_hashes, docs):
+            new_locations_by_hash[text_hash] = SwissNamedPlaces._extract_locations(doc)
+        if self._use_ner_cache:
+            NerResultCache.instance().store_many(model_name, lang, new_locations_by_hash)
+        locations_by_hash.update(new_locations_by_hash)
+        return locations_by_hash
+
+    @staticmethod
+    def _extract_locations(doc):
+        locations = set([])
+        for token in doc:
             if token.ent_type_ in ["LOC", "GPE"]:
-                n_place = unidecode.unidecode(token.text).strip().lower()
-                if n_place not in self._stopwords:
-                    proper_nouns.add(n_place)
-        return proper_nouns
+                locations.add(unidecode.unidecode(token.text).strip().lower())
+        return sorted(locations)
+
+    def _filter_stopwords(self, locations):
+        return set([location for location in locations if location not in self._stopwords])
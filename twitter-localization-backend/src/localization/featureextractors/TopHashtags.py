@@ -1,38 +1,75 @@
 import operator
-import unidecode
 
 from src.localization.FeatureExtractor import FeatureExtractor
-from src.localization.Database import Database
+from src.localization.HashtagHistogramStore import HashtagHistogramStore
+from src.localization.UserContext import UserContext
 
 
 class TopHashtags(FeatureExtractor):
 
-    def __init__(self, vector_length,  allow_cache_updates=False, fe_name="top_hashtags"):
+    # version 2: ties between equally frequent hashtags are broken alphabetically
+    _CACHE_VERSION = 2
+
+    _REQUIRED_TWEET_FIELDS = ["entities.hashtags"]
+
+    def __init__(self, vector_length,  allow_cache_updates=False, fe_name="top_hashtags", use_histograms=True):
+        """
+        :param use_histograms:  if True, users' hashtags are counted from their materialized hashtag histograms (see
+                                HashtagHistogramStore), which are created from the users' tweets if they don't exist
+                                yet; else, users' hashtags are always counted from their tweets
+        """
         super().__init__(fe_name, allow_cache_updates)
         self._vector_length = vector_length
+        self._use_histograms = use_histograms
+
+    def get_required_tweet_fields(self):
+        if self._use_histograms:
+            return []  # tweets are only loaded for users without a histogram
+        return super().get_required_tweet_fields()
+
+    def _get_cache_parameters(self):
+        return {"vector_length": self._vector_length}
 
     def _extract_for(self, twitter_user):
-        user_tweets = TopHashtags._collect_tweets_for_user(twitter_user["id"])
-        return self._calculate_top_hashtags(user_tweets, include_counts=False)
+        return self._extract_for_many([twitter_user])[0]
+
+    def _extract_for_many(self, twitter_users):
+        return [self._rank_hashtags(hashtag_counts) for hashtag_counts in self._get_hashtag_counts(twitter_users)]
+
+    def _get_hashtag_counts(self, twitter_users):
+        """
+        :return: list with a dictionary {normalized hashtag: count} for each user, in the same order as twitter_users
+        """
+        if not self._use_histograms:
+            return [HashtagHistogramStore.count_hashtags(self._get_hashtag_tweets(tu)) for tu in twitter_users]
+        histogram_store = HashtagHistogramStore.instance()
+        histograms = histogram_store.get_histograms([tu["id"] for tu in twitter_users])
+        new_histograms = {}
+        for twitter_user in twitter_users:
+            if (twitter_user["id"] not in histograms) and (twitter_user["id"] not in new_histograms):
+                user_tweets = self._get_hashtag_tweets(twitter_user)
+                new_histograms[twitter_user["id"]] = HashtagHistogramStore.count_hashtags(user_tweets)
+        if len(new_histograms) > 0:
+            histogram_store.set_histograms(new_histograms)
+            histograms.update(new_histograms)
+        return [histograms[tu["id"]] for tu in twitter_users]
 
     @staticmethod
-    def _collect_tweets_for_user(user_id):
-        tweets_cursor = Database.instance().tweets_mongodb.find({"author_id": user_id})
-        return [tweet for tweet in tweets_cursor]
+    def _get_hashtag_tweets(twitter_user):
+        """
+        Returns a user's tweets with their hashtags. get_required_tweet_fields() doesn't ask for hashtags if histograms
+        are used, so they are requested explicitly for users without a histogram.
+        """
+        if isinstance(twitter_user, UserContext):
+            return twitter_user.get_tweets(TopHashtags._REQUIRED_TWEET_FIELDS)
+        return UserContext.load_tweets(twitter_user["id"], TopHashtags._REQUIRED_TWEET_FIELDS)
 
     def _calculate_top_hashtags(self, tweets, include_counts=False):
-        hashtags = {}
-        for tweet in tweets:
-            tweet_hashtags = [ht["text"] for ht in tweet["entities"]["hashtags"]]
-            for hashtag in tweet_hashtags:
-                n_hashtag = TopHashtags._normalize_hashtag(hashtag)
-                hashtags[n_hashtag] = hashtags.get(n_hashtag, 0) + 1
-        hashtag_ranking = sorted(hashtags.items(), key=operator.itemgetter(1), reverse=True)
+        return self._rank_hashtags(HashtagHistogramStore.count_hashtags(tweets), include_counts)
+
+    def _rank_hashtags(self, hashtag_counts, include_counts=False):
+        hashtag_ranking = sorted(sorted(hashtag_counts.items()), key=operator.itemgetter(1), reverse=True)
         top_n = hashtag_ranking[0:self._vector_length]
         if include_counts:
             return top_n
         return [ht[0] for ht in top_n]
-
-    @staticmethod
-    def _normalize_hashtag(hashtag):
-        return unidecode.unidecode(hashtag).lower()
@@ -1,28 +1,99 @@
 from src.localization.FeatureExtractor import FeatureExtractor
-from src.localization.Database import Database
 
 
 class TweetInteractionBehavior(FeatureExtractor):
 
-    def __init__(self, allow_cache_updates=False, fe_name="tweet_interaction_behavior"):
+    _REQUIRED_TWEET_FIELDS = ["entities.user_mentions", "retweeted_status_author_id", "in_reply_to_user_id"]
+
+    def __init__(self, allow_cache_updates=False, fe_name="tweet_interaction_behavior", use_aggregation=False):
+        """
+        :param use_aggregation: if True, the interactions of all users in a batch are computed by a single aggregation
+                                on MongoDB, instead of loading the users' tweets (see _aggregate_interactions())
+        """
         super().__init__(fe_name, allow_cache_updates)
+        self._use_aggregation = use_aggregation
+
+    def get_required_tweet_fields(self):
+        if self._use_aggregation:
+            return []  # tweets are processed on MongoDB
+        return super().get_required_tweet_fields()
 
     def _extract_for(self, twitter_user):
-        user_tweets_cursor = Database.instance().tweets_mongodb.find({
-            "author_id": twitter_user["id"]
-        })
-        num_tweets = user_tweets_cursor.count()
+        if self._use_aggregation:
+            return self._extract_for_many([twitter_user])[0]
+        user_tweets = self._get_tweets(twitter_user)
+        mention_ids, retweet_ids, reply_ids = TweetInteractionBehavior._find_interactions(user_tweets)
+        return self._calculate_feature(len(user_tweets), mention_ids, retweet_ids, reply_ids)
+
+    def _extract_for_many(self, twitter_users):
+        if not self._use_aggregation:
+            return super()._extract_for_many(twitter_users)
+        interactions = self._aggregate_interactions([tu["id"] for tu in twitter_users])
+        no_interactions = (0, set([]), set([]), set([]))
+        return [self._calculate_feature(*interactions.get(tu["id"], no_interactions)) for tu in twitter_users]
+
+    def _calculate_feature(self, num_tweets, mention_ids, retweet_ids, reply_ids):
+        """
+        :param num_tweets:  number of tweets by the user
+        :param mention_ids: set of the IDs of users mentioned by the user
+        :param retweet_ids: set of the IDs of users retweeted by the user
+        :param reply_ids:   set of the IDs of users replied to by the user
+        :return:            feature value
+        """
         if num_tweets == 0:
             return [0, 0, 0]
-        mention_ids, retweet_ids, reply_ids = TweetInteractionBehavior._find_interactions(user_tweets_cursor)
         return [len(mention_ids)/num_tweets, len(retweet_ids)/num_tweets, len(reply_ids)/num_tweets]
 
+    def _aggregate_interactions(self, author_ids):
+        """
+        Computes the number of tweets and the distinct interaction partners of each given user in a single aggregation,
+        which only reads the user IDs from the tweets
+        :param author_ids:  list of user IDs
+        :return:            dictionary mapping the ID of each user with at least one tweet to a tuple (num_tweets,
+                            mention_ids, retweet_ids, reply_ids), with the same semantics as in _calculate_feature()
+        """
+        cursor = self._db.tweets_mongodb.aggregate([
+            {"$match": {"author_id": {"$in": author_ids}}},
+            {"$project": {
+                "_id": 0,
+                "author_id": 1,
+                "mention_ids": {"$ifNull": ["$entities.user_mentions.id", []]},
+                "retweet_id": "$retweeted_status_author_id",
+                "reply_id": "$in_reply_to_user_id"
+            }},
+            {"$group": {
+                "_id": "$author_id",
+                "num_tweets": {"$sum": 1},
+                "mention_ids": {"$push": "$mention_ids"},
+                "retweet_ids": {"$addToSet": "$retweet_id"},
+                "reply_ids": {"$addToSet": "$reply_id"}
+            }},
+            {"$project": {
+                "num_tweets": 1,
+                "retweet_ids": 1,
+                "reply_ids": 1,
+                "mention_ids": {"$reduce": {
+                    "input": "$mention_ids",
+                    "initialValue": [],
+                    "in": {"$setUnion": ["$$value", "$$this"]}
+                }}
+            }}
+        ], allowDiskUse=True)
+        interactions = {}
+        for user_interactions in cursor:
+            # tweets without retweet or reply store null for these fields
+            interactions[user_interactions["_id"]] = (user_interactions["num_tweets"],
+                                                      set(user_interactions["mention_ids"]).difference([None]),
+                                                      set(user_interactions["retweet_ids"]).difference([None]),
+                                                      set(user_interactions["reply_ids"]).difference([None]))
+        return interactions
+
     @staticmethod
-    def _find_interactions(tweets_cursor):
+    def _find_interactions(tweets):
         mention_ids = []
         retweet_ids = []
         reply_ids = []
-        for tweet in tweets_cursor:
+        for tweet in tweets:
             TweetInteractionBehavior._extract_mention_ids(tweet, mention_ids)
             TweetInteractionBehavior._extract_retweet_id(tweet, retweet_ids)
             TweetInteractionBehavior._extract_reply_id(tweet, reply_ids)
@@ -2,6 +2,10 @@ from src.localization.metamodels.FeatureCombination4 import FeatureCombination4
 from src.localization.metamodels.FeatureCombination5 import FeatureCombination5
 from src.util import context, timing
 from src.testing.MetamodelTest import MetamodelTest
+from src.testing.PlaceMatchingComparison import PlaceMatchingComparison
+from src.testing.NeighborIndexBenchmark import NeighborIndexBenchmark
+from src.testing.ClassifierSearch import ClassifierSearch
+from src.localization import TrainValidateTestProvider
 
 
 def try_model():
@@ -17,6 +21,15 @@ def try_model():
                                                          confidence))
 
 
+def update_model():
+    context.load_credentials()
+    context.load_config()
+    metamodel = FeatureCombination4(use_cache=True, allow_cache_updates=True)
+    metamodel.build()
+    score = metamodel.update()  # train on users labeled since the TVT sets were created
+    print("{}: validation score after update: {}".format(timing.get_timestamp(), score))
+
+
 def run_evaluation():
     context.load_credentials()
     context.load_config()
@@ -26,5 +39,27 @@ def run_evaluation():
     print(score)
 
 
+def compare_place_matching():
+    context.load_credentials()
+    context.load_config()
+    train, validate, test = TrainValidateTestProvider.get_data()
+    print(PlaceMatchingComparison().compare(validate))
+
+
+def benchmark_neighbor_indexes():
+    context.load_credentials()
+    context.load_config()
+    train_matrix, test_matrix = ClassifierSearch(FeatureCombination4()).get_feature_matrices()
+    print(NeighborIndexBenchmark().run(train_matrix, test_matrix))
+    print(NeighborIndexBenchmark().run_scaling([1000, 100000, 1000000]))
+
+
+def search_classifiers():
+    context.load_credentials()
+    context.load_config()
+    results = ClassifierSearch(FeatureCombination4()).search()
+    print(ClassifierSearch.format_results(results))
+
+
 if __name__ == "__main__":
     try_model()
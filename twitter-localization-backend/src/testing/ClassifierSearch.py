@@ -0,0 +1,154 @@
+import hashlib
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, cross_validate
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from src.localization import TrainValidateTestProvider
+from src.util import context, paths, timing
+
+
+class ClassifierSearch:
+    """
+    Evaluates a grid of SKLearn classifier configurations on the features of a metamodel, without editing and
+    rebuilding the metamodel for each configuration. The TVT feature matrices are extracted once, and cached in
+    memory and in the directory given by the "feature_matrix_cache_dir" config item (only if the sets are loaded from a
+    TVT file). Each configuration is evaluated with stratified k-fold cross-validation on the train and validation set,
+    and then refit on both sets and scored on the test set; configurations are evaluated in parallel worker processes.
+    """
+
+    # list of (SKLearn classifier, parameter grid) tuples, see sklearn.model_selection.ParameterGrid
+    DEFAULT_SEARCH_SPACE = [
+        (KNeighborsClassifier(), {"n_neighbors": [3, 5, 7, 11], "weights": ["uniform", "distance"]}),
+        (DecisionTreeClassifier(random_state=1), {"max_depth": [None, 3, 5, 10]}),
+        (RandomForestClassifier(random_state=1), {"n_estimators": [50, 100], "max_depth": [None, 5]}),
+        (LogisticRegression(max_iter=1000), {"C": [0.1, 1.0, 10.0]}),
+        (GaussianNB(), {})
+    ]
+
+    _matrices = {}
+
+    def __init__(self, metamodel, search_space=None, num_folds=5, num_workers=-1, seed=1):
+        """
+        :param metamodel:       unbuilt or built metamodel providing the features, is built if necessary
+        :param search_space:    list of (SKLearn classifier, parameter grid) tuples, defaults to DEFAULT_SEARCH_SPACE
+        :param num_folds:       number of cross-validation folds
+        :param num_workers:     number of worker processes, -1 for one per CPU core
+        :param seed:            seed of the fold assignment
+        """
+        self._metamodel = metamodel
+        self._search_space = ClassifierSearch.DEFAULT_SEARCH_SPACE if search_space is None else search_space
+        self._num_folds = num_folds
+        self._num_workers = num_workers
+        self._seed = seed
+
+    def search(self, refresh_matrices=False):
+        """
+        :param refresh_matrices:    if True, cached feature matrices are ignored and extracted again, e.g. after a
+                                    feature extractor changed
+        :return:                    list with the results of all configurations, ordered by descending mean
+                                    cross-validation score
+        """
+        train_matrix, test_matrix = self.get_feature_matrices(refresh_matrices)
+        configurations = [(clf, params)
+                          for clf, param_grid in self._search_space for params in ParameterGrid(param_grid)]
+        print(timing.get_timestamp() + ": ClassifierSearch: evaluating {} configurations on {} samples"
+              .format(len(configurations), len(train_matrix)))
+        folds = StratifiedKFold(n_splits=self._num_folds, shuffle=True, random_state=self._seed)
+        results = Parallel(n_jobs=self._num_workers)(
+            delayed(_evaluate_configuration)(clf, params, train_matrix, test_matrix, folds)
+            for clf, params in configurations)
+        print(timing.get_timestamp() + ": ClassifierSearch: finished search")
+        return sorted(results, key=lambda result: -result["mean_score"])
+
+    def get_feature_matrices(self, refresh=False):
+        """
+        :param refresh: if True, cached feature matrices are ignored and extracted again
+        :return:        (train and validation matrix, test matrix), true class in the last column
+        """
+        if self._metamodel.get_training_matrices()[0] is None:
+            self._metamodel.build()  # the cache key depends on the feature extractors, which exist once built
+        cache_key = self._get_cache_key()
+        if (not refresh) and (cache_key in ClassifierSearch._matrices):
+            return ClassifierSearch._matrices[cache_key]
+        path = None if cache_key is None else self._get_cache_path(cache_key)
+        if (not refresh) and (path is not None) and os.path.exists(path):
+            print(timing.get_timestamp() + ": ClassifierSearch: loading feature matrices " + path)
+            with np.load(path) as cached:
+                matrices = (cached["train"], cached["test"])
+        else:
+            matrices = self._extract_feature_matrices()
+            if path is not None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                np.savez(path, train=matrices[0], test=matrices[1])
+        if cache_key is not None:
+            ClassifierSearch._matrices[cache_key] = matrices
+        return matrices
+
+    def _extract_feature_matrices(self):
+        print(timing.get_timestamp() + ": ClassifierSearch: extracting feature matrices")
+        test = TrainValidateTestProvider.get_data()[2]
+        train_matrix, validate_matrix = self._metamodel.get_training_matrices()
+        return np.vstack([train_matrix, validate_matrix]), self._metamodel.extract_feature_matrix(test)
+
+    def _get_cache_key(self):
+        tvt_hash = TrainValidateTestProvider.get_source_file_hash()
+        if tvt_hash is None:
+            return None
+        # extractors with other parameters or another cache version extract other features
+        feature_cache_keys = ",".join(self._metamodel.get_feature_cache_keys())
+        return "{}_{}_{}".format(type(self._metamodel).__name__, tvt_hash, feature_cache_keys)
+
+    @staticmethod
+    def _get_cache_path(cache_key):
+        directory = paths.convert_project_relative_path(context.get_config("feature_matrix_cache_dir"))
+        return os.path.join(directory, hashlib.sha1(cache_key.encode("utf-8")).hexdigest() + ".npz")
+
+    @staticmethod
+    def format_results(results):
+        """
+        :param results: results returned by search()
+        :return:        table with one line per configuration
+        """
+        lines = ["{:<60} {:>8} {:>8} {:>8} {:>10} {:>12}".format("configuration", "cv mean", "cv std", "test",
+                                                                  "fit [s]", "predict [ms]")]
+        for result in results:
+            lines.append("{:<60} {:>8.4f} {:>8.4f} {:>8.4f} {:>10.4f} {:>12.5f}".format(
+                result["configuration"][0:60], result["mean_score"], result["std_score"], result["test_score"],
+                result["fit_seconds"], result["predict_ms_per_sample"]))
+        return "\n".join(lines)
+
+
+def _evaluate_configuration(clf, params, train_matrix, test_matrix, folds):
+    """
+    Evaluates a single configuration, module-level to be run in worker processes
+    :return:    dictionary with the cross-validation scores, the test score, the mean fit time per fold in seconds,
+                and the mean prediction time per sample in milliseconds
+    """
+    clf = clone(clf).set_params(**params)
+    train_x, train_y = train_matrix[:, :-1], train_matrix[:, -1]
+    cv_results = cross_validate(clf, train_x, train_y, cv=folds, n_jobs=1)
+    clf.fit(train_x, train_y)
+    start = time.perf_counter()
+    test_score = clf.score(test_matrix[:, :-1], test_matrix[:, -1])
+    test_seconds = time.perf_counter() - start
+    fold_size = len(train_matrix) / float(folds.get_n_splits())
+    return {
+        "configuration": "{}({})".format(type(clf).__name__,
+                                         ", ".join(["{}={}".format(k, v) for k, v in sorted(params.items())])),
+        "classifier": clf,
+        "mean_score": float(np.mean(cv_results["test_score"])),
+        "std_score": float(np.std(cv_results["test_score"])),
+        "test_score": float(test_score),
+        "fit_seconds": float(np.mean(cv_results["fit_time"])),
+        "predict_ms_per_sample": 1000 * float(np.mean(cv_results["score_time"])) / fold_size,
+        "test_predict_ms_per_sample": 1000 * test_seconds / max(1, len(test_matrix))
+    }
@@ -2,7 +2,6 @@ import numpy as np
 
 from src.localization import TrainValidateTestProvider
 from src.util import timing
-from tqdm import tqdm
 
 
 class MetamodelTest:
@@ -50,8 +49,8 @@ class MetamodelTest:
 
     def _run_metamodel_on_test_set(self):
         user_results = []
-        for test_user in tqdm(self._test_set):
-            localized_swiss, confidence = self._metamodel.classify(test_user["screen_name"])
+        classifications = self._metamodel.classify_users(self._test_set)
+        for test_user, (localized_swiss, confidence) in zip(self._test_set, classifications):
             user_result = {
                 "user_id": test_user["id"],
                 "is_swiss": test_user["is_swiss"],
@@ -0,0 +1,109 @@
+import time
+
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+from src.localization.classifiers.SKLearn import SKLearn
+from src.util import timing
+
+
+class NeighborIndexBenchmark:
+    """
+    Measures training time, prediction latency and accuracy of the neighbor indexes supported by SKLearn (see
+    SKLearn#NEIGHBOR_INDEXES) on the same feature matrices. Agreement is the fraction of test samples classified like
+    the exact brute-force search does, i.e. the accuracy lost by approximate indexes.
+    """
+
+    DEFAULT_NEIGHBOR_INDEXES = {
+        "brute": {"algorithm": "brute"},
+        "kd_tree (leaf_size=30)": {"algorithm": "kd_tree", "leaf_size": 30},
+        "kd_tree (leaf_size=100)": {"algorithm": "kd_tree", "leaf_size": 100},
+        "ball_tree (leaf_size=30)": {"algorithm": "ball_tree", "leaf_size": 30},
+        "random_projection (4 trees)": {"algorithm": "random_projection", "num_trees": 4, "leaf_size": 32},
+        "random_projection (8 trees)": {"algorithm": "random_projection", "num_trees": 8, "leaf_size": 32},
+        "random_projection (16 trees)": {"algorithm": "random_projection", "num_trees": 16, "leaf_size": 32}
+    }
+
+    def __init__(self, n_neighbors=5, neighbor_indexes=None, num_single_predictions=200):
+        """
+        :param n_neighbors:             number of neighbors of the KNN classifiers
+        :param neighbor_indexes:        dictionary {name: neighbor index}, see SKLearn, defaults to
+                                        DEFAULT_NEIGHBOR_INDEXES
+        :param num_single_predictions:  number of test samples classified one by one to measure the latency of a
+                                        single prediction
+        """
+        self._n_neighbors = n_neighbors
+        self._neighbor_indexes = NeighborIndexBenchmark.DEFAULT_NEIGHBOR_INDEXES if neighbor_indexes is None \
+            else neighbor_indexes
+        self._num_single_predictions = num_single_predictions
+
+    def run(self, train_matrix, test_matrix):
+        """
+        :param train_matrix:    feature matrix with samples as row vectors, true class in the last column
+        :param test_matrix:     feature matrix with samples as row vectors, true class in the last column
+        :return:                dictionary {name of the neighbor index: measurements}
+        """
+        exact_clf = SKLearn(KNeighborsClassifier(self._n_neighbors), {"algorithm": "brute"})
+        exact_clf.train(train_matrix, train_matrix[0:1])
+        exact_classes = exact_clf.classify_batch(test_matrix[:, :-1])[0]
+        results = {}
+        for name, neighbor_index in self._neighbor_indexes.items():
+            print(timing.get_timestamp() + ": NeighborIndexBenchmark: measuring " + name)
+            result, predicted_classes = self._measure(neighbor_index, train_matrix, test_matrix)
+            result["agreement"] = float(np.mean(predicted_classes == exact_classes))
+            results[name] = result
+        return results
+
+    def _measure(self, neighbor_index, train_matrix, test_matrix):
+        clf = SKLearn(KNeighborsClassifier(self._n_neighbors), neighbor_index)
+        start = time.perf_counter()
+        clf.train(train_matrix, train_matrix[0:1])
+        fit_seconds = time.perf_counter() - start
+
+        test_x = test_matrix[:, :-1]
+        start = time.perf_counter()
+        predicted_classes, confidences = clf.classify_batch(test_x)
+        batch_seconds = time.perf_counter() - start
+
+        single_samples = test_x[0:self._num_single_predictions]
+        start = time.perf_counter()
+        for sample in single_samples:
+            clf.classify(sample)
+        single_seconds = time.perf_counter() - start
+
+        result = {
+            "fit_seconds": fit_seconds,
+            "batch_ms_per_sample": 1000 * batch_seconds / len(test_x),
+            "single_ms_per_sample": 1000 * single_seconds / len(single_samples),
+            "accuracy": float(np.mean(predicted_classes == test_matrix[:, -1]))
+        }
+        return result, predicted_classes
+
+    def run_scaling(self, train_sizes, num_test=1000, num_features=3, seed=1):
+        """
+        Runs the benchmark on synthetic feature matrices of growing size, to see how prediction latency scales with
+        the size of the training set
+        :param train_sizes:     list of training set sizes
+        :param num_test:        number of test samples
+        :param num_features:    number of features
+        :return:                dictionary {training set size: benchmark results (see run())}
+        """
+        results = {}
+        for train_size in train_sizes:
+            train_matrix, test_matrix = NeighborIndexBenchmark.make_synthetic_matrices(train_size, num_test,
+                                                                                       num_features, seed)
+            results[train_size] = self.run(train_matrix, test_matrix)
+        return results
+
+    @staticmethod
+    def make_synthetic_matrices(num_train, num_test, num_features=3, seed=1):
+        """
+        Generates two overlapping Gaussian classes (0 and 1) of equal size, as a stand-in for real feature matrices
+        :return:    (train matrix, test matrix), true class in the last column
+        """
+        random_state = np.random.RandomState(seed)
+        num_samples = num_train + num_test
+        labels = random_state.randint(0, 2, size=num_samples)
+        samples = random_state.normal(loc=labels[:, np.newaxis] * 1.5, scale=1.0, size=(num_samples, num_features))
+        matrix = np.hstack([samples, labels[:, np.newaxis]])
+        return matrix[0:num_train], matrix[num_train:]
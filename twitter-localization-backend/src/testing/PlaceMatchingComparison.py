@@ -0,0 +1,67 @@
+import time
+
+from src.localization import LanguageModels
+from src.localization.UserContext import UserContext
+from src.localization.featureextractors.SwissNamedPlaces import SwissNamedPlaces
+from src.util import timing
+
+
+class PlaceMatchingComparison:
+    """
+    Compares the gazetteer matching engine of SwissNamedPlaces against its NER matching engine, on the tweets of a set
+    of users. The NER engine's results are used as the reference.
+    """
+
+    def __init__(self):
+        # without the NER result cache, which would be measured instead of spaCy, and would be filled by comparisons
+        self._ner_extractor = SwissNamedPlaces(matching_engine=SwissNamedPlaces.MATCHING_ENGINE_NER,
+                                               use_ner_cache=False)
+        self._gazetteer_extractor = SwissNamedPlaces(matching_engine=SwissNamedPlaces.MATCHING_ENGINE_GAZETTEER)
+
+    def compare(self, twitter_users):
+        """
+        Runs both matching engines on the tweets of the given users, restricted to languages supported by the NER
+        engine. Precision and recall are micro-averaged over all (tweet, place) pairs, with the NER engine's places as
+        ground truth. Throughput is given in tweets per second, excluding the time needed to load spaCy models.
+        :param twitter_users:   list of Twitter users
+        :return:                dictionary with the comparison results
+        """
+        print(timing.get_timestamp() + ": PlaceMatchingComparison: loading tweets")
+        tweet_fields = self._ner_extractor.get_required_tweet_fields()
+        tweets = []
+        for twitter_user in twitter_users:
+            user_tweets = UserContext.load_tweets(twitter_user["id"], tweet_fields)
+            tweets.extend([tweet for tweet in user_tweets if LanguageModels.is_supported(tweet["lang"])])
+        LanguageModels.preload(set([tweet["lang"] for tweet in tweets]))
+        print(timing.get_timestamp() + ": PlaceMatchingComparison: running NER engine on {} tweets".format(len(tweets)))
+        ner_places, ner_seconds = PlaceMatchingComparison._timed(self._ner_extractor, tweets)
+        print(timing.get_timestamp() + ": PlaceMatchingComparison: running gazetteer engine")
+        gazetteer_places, gazetteer_seconds = PlaceMatchingComparison._timed(self._gazetteer_extractor, tweets)
+        true_positives = 0
+        false_positives = 0
+        false_negatives = 0
+        for reference, matched in zip(ner_places, gazetteer_places):
+            true_positives += len(matched.intersection(reference))
+            false_positives += len(matched.difference(reference))
+            false_negatives += len(reference.difference(matched))
+        return {
+            "num_users": len(twitter_users),
+            "num_tweets": len(tweets),
+            "precision": PlaceMatchingComparison._safe_ratio(true_positives, true_positives + false_positives),
+            "recall": PlaceMatchingComparison._safe_ratio(true_positives, true_positives + false_negatives),
+            "ner_tweets_per_second": PlaceMatchingComparison._safe_ratio(len(tweets), ner_seconds),
+            "gazetteer_tweets_per_second": PlaceMatchingComparison._safe_ratio(len(tweets), gazetteer_seconds),
+            "speedup": PlaceMatchingComparison._safe_ratio(ner_seconds, gazetteer_seconds)
+        }
+
+    @staticmethod
+    def _timed(extractor, tweets):
+        start = time.perf_counter()
+        places = extractor.extract_places_per_tweet(tweets)
+        return places, time.perf_counter() - start
+
+    @staticmethod
+    def _safe_ratio(numerator, denominator):
+        if denominator == 0:
+            return 0
+        return numerator / denominator
@@ -111,10 +111,20 @@ class TwitterApiBinding:
                 print("Error:", err)
                 exit(1)
 
-    def find_multiple_users(self, user_ids):
-        assert type(user_ids) == list
-        assert len(user_ids) <= 100
+    def find_multiple_users(self, user_ids=None, screen_names=None):
+        """
+        Looks up at most 100 users by ID or by screen name, with a single API call
+        :return: list of Twitter users, without the users that don't exist; None if none of the users exist
+        """
+        if screen_names is not None:
+            assert type(screen_names) == list
+            assert len(screen_names) <= 100
+        else:
+            assert type(user_ids) == list
+            assert len(user_ids) <= 100
         try:
+            if screen_names is not None:
+                return self._twitter_api.lookup_users(screen_names=screen_names)
             return self._twitter_api.lookup_users(user_ids=user_ids)
         except tweepy.RateLimitError as err:
             print("TwitterApiBinding#find_multiple_users: unexpected rate limit error - shutting down")
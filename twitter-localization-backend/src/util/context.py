@@ -42,6 +42,25 @@ def load_credentials(credentials_file_name="credentials_default.json", custom_pa
         _credentials = json.load(f)
 
 
+def get_loaded_config():
+    """
+    Get the entire configuration currently loaded into context, e.g. to pass it on to a worker process
+    :return: configuration dictionary
+    """
+    if _config is None:
+        raise ConfigNotLoadedError()
+    return _config
+
+
+def set_config(config):
+    """
+    Load an already parsed configuration into context, e.g. the result of get_loaded_config() in another process
+    :param config: configuration dictionary
+    """
+    global _config
+    _config = config
+
+
 def get_config(key):
     """
     Get config item by key. Throws exception if key doesn't exist.
@@ -0,0 +1,55 @@
+import unittest
+from unittest import mock
+
+from src.localization.Database import Database
+from src.localization.FeatureValueCache import FeatureValueCache
+from src.localization.HashtagHistogramStore import HashtagHistogramStore
+
+
+class FeatureExtractorTestCase(unittest.TestCase):
+    """
+    Base class for feature extractor tests, which replaces MongoDB with in-memory data: the tweets of each user in
+    self.tweets {user ID: list of tweets}, and the hashtag histograms in self.histograms {user ID: hashtag counts}.
+    Tweets are returned with only the fields of the query's projection, like MongoDB does. The feature value cache is
+    disabled.
+    """
+
+    def setUp(self):
+        self.tweets = {}
+        self.histograms = {}
+        self.database = mock.Mock()
+        self.database.tweets_mongodb.find.side_effect = self._find_tweets
+        self.histogram_store = mock.Mock()
+        self.histogram_store.get_histograms.side_effect = self._get_histograms
+        patches = [mock.patch.object(Database, "instance", return_value=self.database),
+                   mock.patch.object(FeatureValueCache, "instance", return_value=FeatureValueCache(0)),
+                   mock.patch.object(HashtagHistogramStore, "instance", return_value=self.histogram_store)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _find_tweets(self, query, projection=None):
+        tweets = self.tweets.get(query["author_id"], [])
+        if projection is None:
+            return tweets
+        return [FeatureExtractorTestCase._project(tweet, projection.keys()) for tweet in tweets]
+
+    def _get_histograms(self, user_ids):
+        return {user_id: self.histograms[user_id] for user_id in user_ids if user_id in self.histograms}
+
+    @staticmethod
+    def _project(document, fields):
+        projected_document = {}
+        for field in fields:
+            path = field.split(".")
+            value = document
+            for key in path:
+                if not (isinstance(value, dict) and (key in value)):
+                    break
+                value = value[key]
+            else:
+                target = projected_document
+                for key in path[:-1]:
+                    target = target.setdefault(key, {})
+                target[path[-1]] = value
+        return projected_document
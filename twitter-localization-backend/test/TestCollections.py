@@ -0,0 +1,20 @@
+import unittest
+
+from src.util import collections
+
+
+class TestCollections(unittest.TestCase):
+
+    def test_split_empty_list(self):
+        self.assertEqual(collections.split_list_into_chunks([], 3), [])
+
+    def test_split_exact_multiple(self):
+        self.assertEqual(collections.split_list_into_chunks([1, 2, 3, 4, 5, 6], 3), [[1, 2, 3], [4, 5, 6]])
+
+    def test_split_with_remainder(self):
+        self.assertEqual(collections.split_list_into_chunks([1, 2, 3, 4, 5], 3), [[1, 2, 3], [4, 5]])
+        self.assertEqual(collections.split_list_into_chunks([1], 3), [[1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+from src.localization import FeatureMatrix
+from src.localization.FeatureExtractor import FeatureExtractor
+from test.FeatureExtractorTestCase import FeatureExtractorTestCase
+
+
+class TweetCount(FeatureExtractor):
+    """
+    Counts a user's tweets, and records the size of each batch of users it is called with
+    """
+
+    _REQUIRED_TWEET_FIELDS = ["id"]
+
+    def __init__(self):
+        super().__init__("tweet_count")
+        self.batch_sizes = []
+
+    def _extract_for_many(self, twitter_users):
+        self.batch_sizes.append(len(twitter_users))
+        return [len(self._get_tweets(twitter_user)) for twitter_user in twitter_users]
+
+
+class TestFeatureMatrix(FeatureExtractorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.sample_set = [{"id": user_id, "is_swiss": user_id % 2 == 0} for user_id in range(0, 7)]
+        self.tweets = dict([(user_id, [{"id": i} for i in range(0, user_id)]) for user_id in range(0, 7)])
+
+    def test_build_feature_matrix_in_chunks(self):
+        tweet_count = TweetCount()
+        matrix = FeatureMatrix.build_feature_matrix(self.sample_set, [tweet_count], False, chunk_size=3)
+        np.testing.assert_array_equal(matrix, [[0, 1], [1, 0], [2, 1], [3, 0], [4, 1], [5, 0], [6, 1]])
+        self.assertEqual(tweet_count.batch_sizes, [3, 3, 1])
+        self.assertEqual(self.database.tweets_mongodb.find.call_count, 7)
+
+    def test_build_feature_matrix_without_labels(self):
+        matrix = FeatureMatrix.build_feature_matrix(self.sample_set[0:2], [TweetCount(), TweetCount()], False,
+                                                    include_labels=False)
+        np.testing.assert_array_equal(matrix, [[0, 0], [1, 1]])
+        self.assertEqual(self.database.tweets_mongodb.find.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
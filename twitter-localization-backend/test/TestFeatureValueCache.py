@@ -0,0 +1,51 @@
+import unittest
+from unittest import mock
+
+from src.localization.FeatureValueCache import FeatureValueCache
+
+
+class TestFeatureValueCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = FeatureValueCache(max_size=2)
+
+    def test_get_put(self):
+        self.assertIsNone(self.cache.get("top_hashtags_v2", 1))
+        self.cache.put("top_hashtags_v2", 1, ["zueri"])
+        self.assertEqual(self.cache.get("top_hashtags_v2", 1), ["zueri"])
+        self.assertIsNone(self.cache.get("tweet_interaction_v1", 1))
+        stats = self.cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 2, 1))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.put("fe", 1, "a")
+        self.cache.put("fe", 2, "b")
+        self.cache.get("fe", 1)
+        self.cache.put("fe", 3, "c")
+        self.assertEqual(self.cache.get("fe", 1), "a")
+        self.assertIsNone(self.cache.get("fe", 2))
+        self.assertEqual(self.cache.get("fe", 3), "c")
+
+    def test_entries_expire(self):
+        cache = FeatureValueCache(max_size=10, ttl_seconds=60)
+        with mock.patch("time.monotonic", return_value=1000.0):
+            cache.put("fe", 1, "a")
+        with mock.patch("time.monotonic", return_value=1059.0):
+            self.assertEqual(cache.get("fe", 1), "a")
+        with mock.patch("time.monotonic", return_value=1061.0):
+            self.assertIsNone(cache.get("fe", 1))
+        self.assertEqual(cache.get_stats()["size"], 0)
+
+    def test_disabled_cache(self):
+        cache = FeatureValueCache(max_size=0)
+        cache.put("fe", 1, "a")
+        self.assertIsNone(cache.get("fe", 1))
+
+    def test_invalidate(self):
+        self.cache.put("fe", 1, "a")
+        self.cache.invalidate("fe", 1)
+        self.assertIsNone(self.cache.get("fe", 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from src.localization.UserContext import UserContext
+from src.localization.featureextractors.HashtagProfileMatch import HashtagProfileMatch
+from test.FeatureExtractorTestCase import FeatureExtractorTestCase
+
+
+class TestHashtagProfileMatch(FeatureExtractorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tweets = {1: [{"entities": {"hashtags": [{"text": "Zueri"}, {"text": "FCZ"}]}}]}
+        self.histogram_store.get_top_hashtags.side_effect = \
+            lambda user_ids, n: [("zueri", 3), ("fcz", 2)] if user_ids == [10] else [("bern", 4), ("ysb", 1)]
+        self.profile_match = HashtagProfileMatch({"zurich": [10], "bern": [20]}, top_k=2, scores_only=False)
+
+    def test_matches_user_without_histogram(self):
+        self.assertEqual(self.profile_match.extract_for({"id": 1}), [["zurich", 1.0]])
+        self.database.tweets_mongodb.find.assert_called_once_with({"author_id": 1}, {"entities.hashtags": 1})
+
+    def test_matches_user_context_without_hashtags(self):
+        user_context = UserContext({"id": 1}, ["entities.user_mentions"])
+        self.assertEqual(self.profile_match.extract_for(user_context), [["zurich", 1.0]])
+
+    def test_scores_are_padded(self):
+        profile_scores = HashtagProfileMatch({"zurich": [10], "bern": [20]}, top_k=2)
+        self.assertEqual(profile_scores.extract_for({"id": 1}), [1.0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+import numpy as np
+
+from src.localization.featureextractors.HashtagTfidfSimilarity import HashtagTfidfSimilarity
+from test.FeatureExtractorTestCase import FeatureExtractorTestCase
+
+
+class TestHashtagTfidfSimilarity(FeatureExtractorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.histograms = {1: {"zueri": 3, "fcz": 1}, 2: {"bern": 2}, 3: {"nyc": 4}, 4: {"london": 1, "nyc": 1}}
+        self.train_set = [{"id": 1, "is_swiss": True}, {"id": 2, "is_swiss": True},
+                          {"id": 3, "is_swiss": False}, {"id": 4, "is_swiss": False}]
+
+    def test_similarities(self):
+        similarity = HashtagTfidfSimilarity(self.train_set)
+        similarities = similarity.calculate_similarities([{"zueri": 1}, {"nyc": 2}, {"unknown": 1}, {}])
+        self.assertEqual(similarities.shape, (4, 2))
+        self.assertGreater(similarities[0, 0], 0)
+        self.assertEqual(similarities[0, 1], 0)
+        self.assertEqual(similarities[1, 0], 0)
+        self.assertGreater(similarities[1, 1], 0)
+        np.testing.assert_array_equal(similarities[2:], np.zeros((2, 2)))
+
+    def test_extract_for_many(self):
+        similarity = HashtagTfidfSimilarity(self.train_set)
+        values = similarity.extract_for_many([{"id": 1}, {"id": 5}])
+        self.assertEqual(len(values), 2)
+        self.assertEqual(values[1], [0.0, 0.0])
+        self.histogram_store.materialize.assert_called_with([1, 5])
+
+    def test_empty_vocabulary(self):
+        self.histograms = {}
+        similarity = HashtagTfidfSimilarity(self.train_set)
+        similarities = similarity.calculate_similarities([{"zueri": 1}, {}])
+        np.testing.assert_array_equal(similarities, np.zeros((2, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
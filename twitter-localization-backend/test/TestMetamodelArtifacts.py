@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from src.localization import MetamodelArtifacts
+from src.localization import TrainValidateTestProvider
+from src.util import context
+
+
+class FakeMetamodel:
+    """
+    Stands in for a built metamodel, Metamodel itself needs the Twitter API
+    """
+
+    config = {"metamodel_class": "FakeMetamodel", "classifier": ["KNeighborsClassifier", [["n_neighbors", 5]]]}
+    feature_cache_keys = ["top_hashtags_v2_3f2a9c0e1b7d"]
+
+    def __init__(self):
+        self.is_loaded = False
+
+    @classmethod
+    def get_config(cls):
+        return cls.config
+
+    def get_feature_cache_keys(self):
+        return FakeMetamodel.feature_cache_keys
+
+    def get_training_scores(self):
+        return [{"SKLearn": 0.9}]
+
+    def on_artifact_loaded(self):
+        self.is_loaded = True
+
+
+class OtherFakeMetamodel(FakeMetamodel):
+    pass
+
+
+class TestMetamodelArtifacts(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        config = {"metamodel_artifacts": {"enabled": True, "dir": directory.name}}
+        patches = [mock.patch.object(context, "get_config", side_effect=lambda key: config[key]),
+                   mock.patch.object(TrainValidateTestProvider, "get_source_file_hash", return_value="tvt")]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        original_config, original_keys = FakeMetamodel.config, FakeMetamodel.feature_cache_keys
+        self.addCleanup(setattr, FakeMetamodel, "config", original_config)
+        self.addCleanup(setattr, FakeMetamodel, "feature_cache_keys", original_keys)
+        self.assertTrue(MetamodelArtifacts.save("Fake", FakeMetamodel()))
+
+    def test_load(self):
+        metamodel = MetamodelArtifacts.load("Fake", FakeMetamodel)
+        self.assertIsInstance(metamodel, FakeMetamodel)
+        self.assertTrue(metamodel.is_loaded)
+        self.assertIsNone(MetamodelArtifacts.load("Missing", FakeMetamodel))
+
+    def test_ignores_other_tvt_data(self):
+        with mock.patch.object(TrainValidateTestProvider, "get_source_file_hash", return_value="other tvt"):
+            self.assertIsNone(MetamodelArtifacts.load("Fake", FakeMetamodel))
+
+    def test_ignores_other_metamodel_class(self):
+        self.assertIsNone(MetamodelArtifacts.load("Fake", OtherFakeMetamodel))
+
+    def test_ignores_other_configuration(self):
+        FakeMetamodel.config = {"metamodel_class": "FakeMetamodel",
+                                "classifier": ["KNeighborsClassifier", [["n_neighbors", 3]]]}
+        self.assertIsNone(MetamodelArtifacts.load("Fake", FakeMetamodel))
+
+    def test_ignores_other_feature_cache_keys(self):
+        FakeMetamodel.feature_cache_keys = ["top_hashtags_v3_3f2a9c0e1b7d"]
+        self.assertIsNone(MetamodelArtifacts.load("Fake", FakeMetamodel))
+
+
+if __name__ == '__main__':
+    unittest.main()
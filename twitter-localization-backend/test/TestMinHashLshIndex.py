@@ -0,0 +1,60 @@
+import unittest
+import zlib
+
+import numpy as np
+
+from src.localization.MinHashLshIndex import MinHashLshIndex
+
+
+class TestMinHashLshIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = MinHashLshIndex(num_perm=128, num_bands=64)
+
+    def test_signature_matches_exact_arithmetic(self):
+        items = ["zueri", "bern", "fcz", "ysb"]
+        signature = self.index.compute_signature(items)
+        self.assertEqual(signature.dtype, np.uint64)
+        prime = (1 << 61) - 1
+        expected = [min(((int(a) * zlib.crc32(item.encode("utf-8")) + int(b)) % prime) & ((1 << 32) - 1)
+                        for item in items) for a, b in zip(self.index._a, self.index._b)]
+        self.assertEqual(signature.tolist(), expected)
+
+    def test_empty_set_signature(self):
+        signature = self.index.compute_signature([])
+        self.assertEqual(signature.dtype, np.uint64)
+        self.assertTrue(np.all(signature == (1 << 32) - 1))
+        self.assertEqual(self.index.query([]), [])
+
+    def test_query(self):
+        self.index.add("zurich", ["zueri", "fcz", "limmat", "zuerich"])
+        self.index.add("bern", ["bern", "ysb", "aare", "baern"])
+        results = self.index.query(["zueri", "fcz", "limmat", "zuerich"])
+        self.assertEqual(results, [("zurich", 1.0)])
+        results = self.index.query(["zueri", "fcz", "limmat", "bern"], top_k=1)
+        self.assertEqual(results[0][0], "zurich")
+        self.assertTrue(0 < results[0][1] < 1)
+
+    def test_estimate_jaccard(self):
+        items = ["tag{}".format(i) for i in range(0, 100)]
+        index = MinHashLshIndex(num_perm=512, num_bands=128)
+        similarity = MinHashLshIndex.estimate_jaccard(index.compute_signature(items[0:75]),
+                                                      index.compute_signature(items[25:100]))
+        self.assertAlmostEqual(similarity, 50 / 100.0, delta=0.1)
+
+    def test_add_replaces_and_remove(self):
+        self.index.add("zurich", ["zueri"])
+        self.index.add("zurich", ["bern"])
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.index.query(["zueri"]), [])
+        self.index.remove("zurich")
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(self.index.query(["bern"]), [])
+
+    def test_bands_must_divide_signature(self):
+        with self.assertRaises(ValueError):
+            MinHashLshIndex(num_perm=128, num_bands=60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+from src.localization.classifiers.RandomProjectionKNN import RandomProjectionKNN
+
+
+class TestRandomProjectionKNN(unittest.TestCase):
+
+    def setUp(self):
+        random_state = np.random.RandomState(0)
+        self.train_x = random_state.normal(size=(2000, 3))
+        self.train_y = (self.train_x[:, 0] + self.train_x[:, 1] > 0).astype(int)
+        self.test_x = random_state.normal(size=(300, 3))
+        self.knn = RandomProjectionKNN(n_neighbors=5).fit(self.train_x, self.train_y)
+        self.exact_knn = KNeighborsClassifier(n_neighbors=5).fit(self.train_x, self.train_y)
+
+    def test_neighbors_agree_with_exact_knn(self):
+        neighbors = self.knn.kneighbors(self.test_x)
+        exact_neighbors = self.exact_knn.kneighbors(self.test_x, return_distance=False)
+        self.assertEqual(neighbors.shape, (300, 5))
+        recall = np.mean([len(set(row) & set(exact_row)) / 5.0 for row, exact_row in zip(neighbors, exact_neighbors)])
+        self.assertGreater(recall, 0.9)
+
+    def test_predictions_agree_with_exact_knn(self):
+        agreement = np.mean(self.knn.predict(self.test_x) == self.exact_knn.predict(self.test_x))
+        self.assertGreater(agreement, 0.95)
+        probabilities = self.knn.predict_proba(self.test_x)
+        np.testing.assert_allclose(probabilities.sum(axis=1), 1)
+        self.assertAlmostEqual(self.knn.score(self.test_x, self.exact_knn.predict(self.test_x)), agreement)
+
+    def test_small_training_set_is_exact(self):
+        knn = RandomProjectionKNN(n_neighbors=3).fit(self.train_x[0:20], self.train_y[0:20])
+        exact_knn = KNeighborsClassifier(n_neighbors=3).fit(self.train_x[0:20], self.train_y[0:20])
+        np.testing.assert_array_equal(np.sort(knn.kneighbors(self.test_x), axis=1),
+                                      np.sort(exact_knn.kneighbors(self.test_x, return_distance=False), axis=1))
+
+    def test_empty_query(self):
+        self.assertEqual(self.knn.kneighbors(np.empty((0, 3))).shape, (0, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from unittest import mock
+
+from sklearn.neighbors import KNeighborsClassifier
+
+from src.localization.classifiers.RandomProjectionKNN import RandomProjectionKNN
+from src.localization.classifiers.SKLearn import SKLearn
+from src.util import context
+
+
+class TestSKLearn(unittest.TestCase):
+
+    def setUp(self):
+        self.knn_index = {"algorithm": "random_projection", "num_trees": 4, "leaf_size": 16}
+        patch = mock.patch.object(context, "get_config", side_effect=lambda key: self.knn_index)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_configured_index_replaces_default_knn(self):
+        clf = SKLearn(KNeighborsClassifier(7))._clf
+        self.assertIsInstance(clf, RandomProjectionKNN)
+        self.assertEqual((clf.n_neighbors, clf.num_trees, clf.leaf_size), (7, 4, 16))
+
+    def test_configured_index_keeps_explicit_algorithm(self):
+        knn = KNeighborsClassifier(7, algorithm="ball_tree", leaf_size=10)
+        self.assertIs(SKLearn(knn)._clf, knn)
+        self.assertEqual((knn.algorithm, knn.leaf_size), ("ball_tree", 10))
+
+    def test_explicit_index_is_applied(self):
+        knn = KNeighborsClassifier(7, algorithm="ball_tree")
+        SKLearn(knn, neighbor_index={"algorithm": "kd_tree", "leaf_size": 20})
+        self.assertEqual((knn.algorithm, knn.leaf_size), ("kd_tree", 20))
+
+    def test_random_projection_rejects_unsupported_settings(self):
+        for knn in [KNeighborsClassifier(weights="distance"), KNeighborsClassifier(p=1),
+                    KNeighborsClassifier(metric="cosine")]:
+            with self.assertRaises(ValueError):
+                SKLearn(knn)
+        self.assertIsInstance(SKLearn(KNeighborsClassifier(metric="euclidean"))._clf, RandomProjectionKNN)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from src.localization.SortedIdSet import SortedIdSet
+
+
+class TestSortedIdSet(unittest.TestCase):
+
+    def setUp(self):
+        self.large_id = 1234567890123456789
+        self.id_set = SortedIdSet([42, 7, self.large_id, 7, 1000])
+
+    def test_deduplicates_and_sorts(self):
+        self.assertEqual(len(self.id_set), 4)
+        self.assertEqual(self.id_set.to_list(), [7, 42, 1000, self.large_id])
+
+    def test_membership(self):
+        self.assertTrue(self.id_set.contains(42))
+        self.assertIn(self.large_id, self.id_set)
+        self.assertNotIn(self.large_id + 1, self.id_set)
+        self.assertEqual(self.id_set.contains_many([0, 7, 8, 1000, self.large_id + 1]).tolist(),
+                         [False, True, False, True, False])
+        self.assertEqual(self.id_set.count_contained([7, 42, 43, self.large_id]), 3)
+
+    def test_empty_set(self):
+        empty_set = SortedIdSet()
+        self.assertEqual(len(empty_set), 0)
+        self.assertEqual(empty_set.contains_many([1, 2]).tolist(), [False, False])
+        self.assertEqual(empty_set.count_contained([]), 0)
+
+    def test_set_operations(self):
+        other = SortedIdSet([42, 5, self.large_id])
+        self.assertEqual(self.id_set.difference(other).to_list(), [7, 1000])
+        self.assertEqual(self.id_set.union(other).to_list(), [5, 7, 42, 1000, self.large_id])
+        self.assertEqual(SortedIdSet().union(other).to_list(), [5, 42, self.large_id])
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ids.npy")
+            self.id_set.save(path)
+            loaded_set = SortedIdSet.load(path)
+            self.assertEqual(loaded_set.to_list(), self.id_set.to_list())
+            self.assertTrue(loaded_set.contains(self.large_id))
+            del loaded_set
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from src.localization.UserContext import UserContext
+from src.localization.featureextractors.TopHashtags import TopHashtags
+from test.FeatureExtractorTestCase import FeatureExtractorTestCase
+
+
+class TestTopHashtags(FeatureExtractorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tweets = {1: [{"entities": {"hashtags": [{"text": "Zueri"}, {"text": "zueri"}, {"text": "Bern"}],
+                                         "user_mentions": []}}],
+                       2: [{"entities": {"hashtags": [{"text": "Basel"}]}}]}
+        self.histograms = {2: {"basel": 1}}
+        self.top_hashtags = TopHashtags(10)
+
+    def test_histogram_path_loads_hashtags_for_users_without_histogram(self):
+        values = self.top_hashtags.extract_for_many([{"id": 1}, {"id": 2}])
+        self.assertEqual(values, [["zueri", "bern"], ["basel"]])
+        self.database.tweets_mongodb.find.assert_called_once_with({"author_id": 1}, {"entities.hashtags": 1})
+        self.histogram_store.set_histograms.assert_called_once_with({1: {"zueri": 2, "bern": 1}})
+
+    def test_histogram_path_reloads_user_context_without_hashtags(self):
+        user_context = UserContext({"id": 1}, ["entities.user_mentions"])
+        self.assertEqual(user_context.get_tweets(["entities.user_mentions"]), [{"entities": {"user_mentions": []}}])
+        self.assertEqual(self.top_hashtags.extract_for(user_context), ["zueri", "bern"])
+
+    def test_tweet_path_loads_hashtags(self):
+        top_hashtags = TopHashtags(10, use_histograms=False)
+        self.assertEqual(top_hashtags.extract_for({"id": 2}), ["basel"])
+        self.histogram_store.get_histograms.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()